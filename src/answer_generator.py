@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Answer Generation Module
+
+Answers queued questions on a worker, combining the questions that queued up
+while a call was running into one batch, and routes every answer back to its
+caller by id.
+"""
+
+import collections
+import itertools
+import queue
+import threading
+import unicodedata
+
+# Placeholder answers keyed by language code
+_VI_ANSWER = "[Giả lập] Thủ đô của Pháp là Paris. Đây là một thành phố lịch sử và văn hóa."
+_ANSWERS_BY_LANG = {
+    "en": "[Simulated] The capital of France is Paris. It is a historical and cultural city.",
+    "ja": "[シミュレーション] フランスの首都はパリです。それは歴史的で文化的な都市です。",
+    "vi": _VI_ANSWER,
+}
+
+
+def _cache_key(question, language_code):
+    """Build the answer cache key for a question.
+    
+    Args:
+        question: The question text
+        language_code: The target language code
+    
+    Returns:
+        A (normalized question, language code) tuple
+    """
+    return unicodedata.normalize("NFKC", question).lower().strip(), language_code
+
+
+def _placeholder_answers(batch):
+    """Simulate answering a batch of questions (temporary placeholder).
+    
+    Args:
+        batch: List of (question, language_code) tuples
+    
+    Returns:
+        A list of Vietnamese answers, one per question
+    """
+    # This would be a single batched API call in the full implementation
+    return [_VI_ANSWER for _ in batch]
+
+
+def _placeholder_translations(texts, language_codes):
+    """Simulate translating answers (temporary placeholder).
+    
+    Args:
+        texts: List of Vietnamese answers
+        language_codes: Target language code for each answer
+    
+    Returns:
+        A list of translated answers
+    """
+    return [
+        _ANSWERS_BY_LANG.get(language_code, text)
+        for text, language_code in zip(texts, language_codes)
+    ]
+
+
+class AnswerGenerator:
+    """Class for generating answers to queued questions in batches."""
+    
+    def __init__(self, executor, generate_batch=None, translate_batch=None,
+                 max_batch_size=8, cache_size=128):
+        """Initialize the answer generator.
+        
+        Args:
+            executor: concurrent.futures executor that runs the batching loop
+            generate_batch: Function taking a list of (question, language_code)
+                tuples and returning a list of Vietnamese answers.
+                Defaults to the simulated answers.
+            translate_batch: Function taking a list of Vietnamese answers and
+                their target language codes and returning the translations,
+                such as Translator.translate_batch. Defaults to the
+                simulated translations.
+            max_batch_size: Maximum number of questions answered per call
+            cache_size: Number of recent answers kept for repeated questions
+        """
+        self._executor = executor
+        self._generate_batch = generate_batch or _placeholder_answers
+        self._translate_batch = translate_batch or _placeholder_translations
+        self.max_batch_size = max_batch_size
+        self._queue = queue.Queue()
+        self._uids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._draining = False
+        self._closed = False
+        self.cache_size = cache_size
+        self._cache = collections.OrderedDict()
+    
+    def get_cached(self, question, language_code):
+        """Look up the answer to a question that was asked before.
+        
+        Args:
+            question: The question text
+            language_code: The target language code
+        
+        Returns:
+            A (vi_answer, lang_answer) tuple, or None if it isn't cached
+        """
+        key = _cache_key(question, language_code)
+        with self._lock:
+            answer = self._cache.get(key)
+            if answer is not None:
+                self._cache.move_to_end(key)
+            return answer
+    
+    def submit(self, question, language_code, callback):
+        """Queue a question to be answered.
+        
+        It runs straight away when the worker is idle, otherwise in the
+        batch after the call in progress.
+        
+        Args:
+            question: The question text
+            language_code: The target language code
+            callback: Function called from the worker thread with
+                (uid, language_code, vi_answer, lang_answer). Both answers
+                are None if generation failed.
+        
+        Returns:
+            The unique id the answer will be reported under
+        """
+        uid = next(self._uids)
+        self._queue.put((uid, question, language_code, callback))
+        
+        with self._lock:
+            start = not self._draining
+            self._draining = True
+        
+        if start:
+            self._executor.submit(self._drain)
+        
+        return uid
+    
+    def close(self):
+        """Stop answering; queued questions are dropped without callbacks."""
+        self._closed = True
+    
+    def _drain(self):
+        """Answer queued questions batch by batch until the queue is empty.
+        
+        There is no wait for more questions: the UI has one question in flight
+        at a time, so a delay would only add latency. Questions queued while
+        a call runs are picked up together by the next sweep.
+        """
+        while not self._closed:
+            batch = []
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            if batch:
+                self._run_batch(batch)
+                continue
+            
+            with self._lock:
+                # A question queued after the sweep keeps this loop alive
+                if self._queue.empty():
+                    self._draining = False
+                    return
+        
+        with self._lock:
+            self._draining = False
+    
+    def _run_batch(self, batch):
+        """Generate answers for one batch and route them to their callbacks.
+        
+        Args:
+            batch: List of (uid, question, language_code, callback) tuples
+        """
+        try:
+            vi_answers = self._generate_batch(
+                [(question, language_code) for _, question, language_code, _ in batch]
+            )
+            
+            # Translate the Vietnamese answers instead of generating each
+            # language separately; Vietnamese targets need no translation
+            lang_answers = list(vi_answers)
+            targets = [i for i, item in enumerate(batch) if item[2] != "vi"]
+            translations = self._translate_batch(
+                [vi_answers[i] for i in targets],
+                [batch[i][2] for i in targets]
+            )
+            for i, translation in zip(targets, translations):
+                lang_answers[i] = translation
+            
+            answers = list(zip(vi_answers, lang_answers))
+            
+            with self._lock:
+                for (_, question, language_code, _), answer in zip(batch, answers):
+                    self._cache[_cache_key(question, language_code)] = answer
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        except Exception as e:
+            print(f"Error generating answers: {e}")
+            answers = [(None, None)] * len(batch)
+        
+        if self._closed:
+            return
+        
+        for (uid, _, language_code, callback), (vi_answer, lang_answer) in zip(batch, answers):
+            callback(uid, language_code, vi_answer, lang_answer)
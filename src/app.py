@@ -9,26 +9,64 @@ convert speech to text, and generate appropriate answers in multiple languages.
 """
 
 import os
+import concurrent.futures
+import enum
+import threading
+import weakref
 import tkinter as tk
 from tkinter import ttk, font, messagebox
 from dotenv import load_dotenv
 from tkinter import scrolledtext
-import threading
-import time
-import sys
-import traceback
 
 # Import custom modules
 from audio_recorder import AudioRecorder
 from transcriber import Transcriber
+from answer_generator import AnswerGenerator
+from translator import Translator
+from llm_client import LLMClient
 from fix_mac_certificates import fix_mac_certificates
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Speech recognition settings, read once at startup
+WHISPER_MODEL = os.getenv("WHISPER_MODEL")
+WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE")
+WHISPER_DEVICE = os.getenv("WHISPER_DEVICE")
+# Language spoken in the recordings; "en" allows an English-only model
+WHISPER_LANGUAGE = os.getenv("WHISPER_LANGUAGE")
+# Load the model at startup instead of on the first Record click
+PRELOAD_WHISPER = os.getenv("PRELOAD_WHISPER") == "1"
+# CTranslate2 NLLB model used to translate answers; simulated when unset
+TRANSLATOR_MODEL_PATH = os.getenv("TRANSLATOR_MODEL_PATH")
+# Chat model that answers questions; answers are simulated when unset
+ANSWER_MODEL = os.getenv("ANSWER_MODEL")
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
+class AppState(enum.IntEnum):
+    """Recording and transcription states of the main window."""
+    IDLE = 0
+    STARTING = 1
+    RECORDING = 2
+    STOPPING = 3
+    TRANSCRIBING = 4
+
+
 class MeetingAssistantApp:
     """Main application class for the Meeting Question Assistant."""
     
+    # Output languages shown as radio buttons: (display name, language code)
+    _LANGUAGES = (("English", "en"), ("Japanese", "ja"), ("Vietnamese", "vi"))
+    _WHISPER_MODELS = (
+        "distil-small.en", "distil-large-v3", "tiny", "base", "small",
+        "medium", "large-v3-turbo", "large-v3",
+    )
+    _LANGUAGE_MAP = {"en": "English", "ja": "Japanese", "vi": "Vietnamese"}
+    
+    # Tk roots whose styles have been configured, mapped to the named fonts
+    # created for them (tkinter deletes a named font once its Font object dies)
+    _styled_roots = weakref.WeakKeyDictionary()
+    
     def __init__(self, root):
         """Initialize the application UI and components.
         
@@ -48,10 +86,49 @@ class MeetingAssistantApp:
         self.root.bind("<Escape>", self._end_fullscreen)
         
         # Recording state
-        self.is_recording = False
+        self.state = AppState.IDLE
         self.audio_file = None
         self.model_loaded = False
         
+        # Whether the processing indicator is currently shown
+        self._processing_active = False
+        
+        # Persistent worker for answer generation, reused across questions.
+        # Questions are queued and answered in batches; only the answer for
+        # the most recent question is displayed.
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="ask-away-worker"
+        )
+        translate_batch = None
+        if TRANSLATOR_MODEL_PATH:
+            # Runs on the CPU so it doesn't compete with Whisper for the GPU
+            translate_batch = Translator(TRANSLATOR_MODEL_PATH, compute_type="int8").translate_batch
+        self._llm_client = None
+        generate_batch = None
+        if ANSWER_MODEL and OPENAI_API_KEY:
+            self._llm_client = LLMClient(OPENAI_API_KEY, model=ANSWER_MODEL)
+            generate_batch = self._llm_client.generate_batch
+        self._answer_generator = AnswerGenerator(
+            self._executor,
+            generate_batch=generate_batch,
+            translate_batch=translate_batch
+        )
+        self._current_question_uid = None
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+        
+        # Results posted by workers, flushed to the UI once per idle cycle
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._flush_scheduled = False
+        self._flush_after_id = None
+        
+        # Transcribed segments posted by the worker, drawn in batches
+        self._pending_segments = []
+        self._segment_lock = threading.Lock()
+        self._segment_flush_scheduled = False
+        self._segment_after_id = None
+        
         # Set up the UI components
         self._setup_ui()
         
@@ -60,8 +137,39 @@ class MeetingAssistantApp:
         self._update_status("Initializing... Loading speech recognition model...")
         
         # Initialize audio recorder and transcriber
+        self.audio_recorder = AudioRecorder(sample_rate=16000)
+        # Without WHISPER_MODEL, the default model follows WHISPER_LANGUAGE
+        self.transcriber = self._create_transcriber(WHISPER_MODEL)
+        self.model_var.set(self.transcriber.model_name)
+        self._model_loading = False
+        
+        # Without preloading, the model is loaded on the first Record click
+        if not PRELOAD_WHISPER:
+            self._update_status("Click Record to load the speech recognition model on first use.")
+            self.record_button.state(["!disabled"])
+        
+        # Finish slow startup work in the background so the window shows now.
+        # The thread starts from the event loop: it reports back through
+        # after_idle, which fails from another thread before mainloop runs.
+        self._bootstrap_after_id = self.root.after(0, self._start_bootstrap)
+    
+    def _start_bootstrap(self):
+        """Start the bootstrap thread once the Tk event loop is running."""
+        self._bootstrap_after_id = None
+        threading.Thread(target=self._bootstrap, name="ask-away-bootstrap", daemon=True).start()
+    
+    def _bootstrap(self):
+        """Run slow startup work off the Tk thread."""
         # Try to fix SSL certificate issues on macOS
         cert_fixed = fix_mac_certificates()
+        self._on_ui_thread(self._on_bootstrap_complete)(cert_fixed)
+    
+    def _on_bootstrap_complete(self, cert_fixed):
+        """Callback for when the background startup work has finished.
+        
+        Args:
+            cert_fixed: Boolean indicating if SSL certificates are usable
+        """
         if not cert_fixed:
             messagebox.showwarning(
                 "SSL Certificate Warning",
@@ -73,31 +181,44 @@ For proper security, consider one of these solutions:
 2. Run the macOS certificate installation script"""
             )
         
-        self.audio_recorder = AudioRecorder(sample_rate=16000)
-        import os
-        whisper_model = os.getenv("WHISPER_MODEL", "medium")
-        self.transcriber = Transcriber(model_name=whisper_model)
-        
-        # Now that status_bar exists, load the Whisper model in the background
-        self.transcriber.load_model(callback=self._on_model_loaded)
+        # Model downloads need the certificates, so preloading waits for them
+        if PRELOAD_WHISPER:
+            self._start_model_load()
     
     def _configure_styles(self):
-        """Configure custom styles for the application."""
+        """Configure custom styles for the application.
+        
+        ttk styles belong to the Tk interpreter, so they are configured once
+        per Tk root and reused by any further windows on the same root.
+        """
+        tk_root = self.root._root()
+        if tk_root in self._styled_roots:
+            return
+        
         # Get default font
-        default_font = font.nametofont("TkDefaultFont")
+        default_font = font.nametofont("TkDefaultFont", root=tk_root)
         default_font.configure(size=11)
         
+        # Named fonts shared by every widget, so Tk keeps one metrics cache each
+        self._styled_roots[tk_root] = (
+            font.Font(root=tk_root, name="AppBody", size=12),
+            font.Font(root=tk_root, name="AppBodyLg", size=13),
+            font.Font(root=tk_root, name="AppHeading", size=12, weight="bold"),
+            font.Font(root=tk_root, name="AppLabel", size=11, weight="bold"),
+            font.Font(root=tk_root, name="AppTitle", size=16, weight="bold"),
+        )
+        
         # Configure styles
-        style = ttk.Style()
+        style = ttk.Style(tk_root)
         
         # Button styles
-        style.configure("Record.TButton", font=(None, 12, "bold"), padding=10)
-        style.configure("OK.TButton", font=(None, 12, "bold"), padding=8)
+        style.configure("Record.TButton", font="AppHeading", padding=10)
+        style.configure("OK.TButton", font="AppHeading", padding=8)
         
         # Frame styles
         style.configure("TFrame", background="#f5f5f5")
         style.configure("TLabelframe", background="#f5f5f5")
-        style.configure("TLabelframe.Label", font=(None, 11, "bold"))
+        style.configure("TLabelframe.Label", font="AppLabel")
     
     def _toggle_fullscreen(self, event=None):
         """Toggle fullscreen mode."""
@@ -111,6 +232,22 @@ For proper security, consider one of these solutions:
         self.root.attributes("-fullscreen", False)
         return "break"
     
+    def _on_close(self):
+        """Release background workers and timers, then close the main window."""
+        # Cancel pending Tk callbacks so destroy() does not have to run them
+        for after_id in (self._bootstrap_after_id, self._warning_after_id,
+                         self._flush_after_id, self._segment_after_id):
+            if after_id is not None:
+                self.root.after_cancel(after_id)
+        
+        self._answer_generator.close()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._llm_client is not None:
+            self._llm_client.close()
+        self.audio_recorder.close()
+        self.transcriber.close()
+        self.root.destroy()
+    
     def _setup_ui(self):
         """Set up the user interface components."""
         # Main frame with padding
@@ -125,7 +262,7 @@ For proper security, consider one of these solutions:
         title_label = ttk.Label(
             top_frame, 
             text="Meeting Question Assistant", 
-            font=(None, 16, "bold")
+            font="AppTitle"
         )
         title_label.pack(side=tk.LEFT, pady=5)
         
@@ -140,35 +277,43 @@ For proper security, consider one of these solutions:
         # Main content frame
         content_frame = ttk.Frame(self.main_frame)
         content_frame.pack(fill=tk.BOTH, expand=True)
+        self.content_frame = content_frame
+        
+        # Grid layout: the text and answer rows share the extra height
+        content_frame.columnconfigure(0, weight=1)
+        content_frame.rowconfigure(1, weight=1)
+        content_frame.rowconfigure(3, weight=1)
         
         # Record button with custom style - moved to top for better flow
+        # The label is driven by a StringVar since it flips on every recording
+        self.record_text_var = tk.StringVar(value="🎙️ Listen to question")
         self.record_button = ttk.Button(
             content_frame, 
-            text="🎙️ Listen to question",
+            textvariable=self.record_text_var,
             command=self._record_audio,
             style="Record.TButton"
         )
-        self.record_button.pack(pady=15)  # Increased padding
+        self.record_button.grid(row=0, column=0, pady=15)  # Increased padding
         
         # Initially disable the record button until the model is loaded
         self.record_button.state(["disabled"])
         
         # Text box for displaying transcribed text
         self.text_frame = ttk.LabelFrame(content_frame, text="Question Text")
-        self.text_frame.pack(fill=tk.BOTH, expand=True, pady=15)  # Increased padding
+        self.text_frame.grid(row=1, column=0, sticky="nsew", pady=15)  # Increased padding
 
         # Use ScrolledText for better text display with scrollbar
         self.text_box = scrolledtext.ScrolledText(
             self.text_frame, 
             height=7,  # Increased height
             wrap=tk.WORD,
-            font=(None, 13)  # Larger font
+            font="AppBodyLg"  # Larger font
         )
         self.text_box.pack(fill=tk.BOTH, expand=True, padx=12, pady=12)  # Increased padding
         
         # Controls frame (language selection and buttons)
         controls_frame = ttk.Frame(content_frame)
-        controls_frame.pack(fill=tk.X, pady=15)  # Increased padding
+        controls_frame.grid(row=2, column=0, sticky="ew", pady=15)  # Increased padding
         
         # Language selection
         lang_frame = ttk.LabelFrame(controls_frame, text="Output Language")
@@ -176,17 +321,35 @@ For proper security, consider one of these solutions:
         
         # Language options
         self.language_var = tk.StringVar(value="en")
-        languages = [("English", "en"), ("Japanese", "ja"), ("Vietnamese", "vi")]
         
         # Create radio buttons for each language
-        for i, (lang_name, lang_code) in enumerate(languages):
+        for i, (lang_name, lang_code) in enumerate(self._LANGUAGES):
             rb = ttk.Radiobutton(
                 lang_frame, 
                 text=lang_name,
                 value=lang_code,
                 variable=self.language_var
             )
-            rb.pack(side=tk.LEFT, padx=10, pady=5)
+            rb.grid(row=0, column=i, padx=10, pady=5, sticky="w")
+        
+        # Configure column weights once, as for the other grid layouts
+        for i in range(len(self._LANGUAGES)):
+            lang_frame.columnconfigure(i, weight=1)
+        
+        # Speech recognition model, overriding the language-based default
+        model_frame = ttk.LabelFrame(controls_frame, text="Speech Model")
+        model_frame.pack(side=tk.LEFT, padx=5)
+        
+        self.model_var = tk.StringVar()
+        self.model_combobox = ttk.Combobox(
+            model_frame,
+            textvariable=self.model_var,
+            values=self._WHISPER_MODELS,
+            state="readonly",
+            width=16
+        )
+        self.model_combobox.pack(padx=10, pady=5)
+        self.model_combobox.bind("<<ComboboxSelected>>", self._on_model_selected)
         
         # OK button with custom style
         ok_frame = ttk.Frame(controls_frame)
@@ -200,57 +363,67 @@ For proper security, consider one of these solutions:
         )
         self.ok_button.pack(fill=tk.BOTH, expand=True, pady=5)
         
-        # Results display in two columns
-        self.results_frame = ttk.LabelFrame(content_frame, text="Answer")
-        self.results_frame.pack(fill=tk.BOTH, expand=True, pady=15)  # Increased padding
-        
-        # Two-column display for results with improved layout
-        results_columns = ttk.Frame(self.results_frame)
-        results_columns.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)  # Increased padding
+        # The answer panel (row 3) is built on first use by _ensure_results_ui
+        self.results_frame = None
         
-        # Configure equal column widths
-        results_columns.columnconfigure(0, weight=1)  # First column gets equal weight
-        results_columns.columnconfigure(1, weight=1)  # Second column gets equal weight
+        # Static label shown while processing (no animation timer to drive).
+        # grid_remove keeps the slot's options, so toggling it does not
+        # re-layout the sibling widgets.
+        self.processing_frame = ttk.Frame(content_frame)
+        self.processing_frame.grid(row=4, column=0, sticky="ew", pady=(5, 0))
+        self.processing_frame.columnconfigure(1, weight=1)
+        self.processing_frame.grid_remove()  # Hide initially
         
-        # Vietnamese column - using grid instead of pack for better control
-        vi_frame = ttk.LabelFrame(results_columns, text="Vietnamese")
-        vi_frame.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)  # Using grid
+        self.processing_label = ttk.Label(self.processing_frame, text="⏳ Processing…")
+        self.processing_label.grid(row=0, column=0, sticky="w")
         
-        self.vi_text = scrolledtext.ScrolledText(
-            vi_frame, 
-            wrap=tk.WORD,
-            font=(None, 12)  # Increased font size
+        # Transcription progress, advanced by each decoded segment only
+        self.progress_var = tk.IntVar(value=0)
+        self.progress_bar = ttk.Progressbar(
+            self.processing_frame,
+            mode="determinate",
+            maximum=1000,
+            variable=self.progress_var
         )
-        self.vi_text.pack(fill=tk.BOTH, expand=True, padx=8, pady=8)  # Increased padding
+        self.progress_bar.grid(row=0, column=1, sticky="ew", padx=(10, 0))
+        self.progress_bar.grid_remove()  # Only shown while transcribing
+        self._transcription_span = None
+        
+        # Inline validation warning, shown briefly instead of a modal dialog
+        self.warning_label = ttk.Label(content_frame, text="", foreground="red")
+        self.warning_label.grid(row=5, column=0, sticky="ew", pady=(5, 0))
+        self.warning_label.grid_remove()  # Hide initially
+        self._warning_after_id = None
+    
+    def _ensure_results_ui(self):
+        """Create the answer panel the first time it is needed.
         
-        # Target language column - using grid for equal width
-        self.target_lang_frame = ttk.LabelFrame(results_columns, text="Target Language")
-        self.target_lang_frame.grid(row=0, column=1, sticky="nsew", padx=5, pady=5)  # Using grid
+        Building it lazily keeps these widgets out of the startup path until
+        the user actually asks a question.
+        """
+        if self.results_frame is not None:
+            return
         
-        self.lang_text = scrolledtext.ScrolledText(
-            self.target_lang_frame, 
-            wrap=tk.WORD,
-            font=(None, 12)  # Increased font size
-        )
-        self.lang_text.pack(fill=tk.BOTH, expand=True, padx=8, pady=8)  # Increased padding
+        # One Text widget holding both answers as tagged regions
+        self.results_frame = ttk.LabelFrame(self.content_frame, text="Answer")
+        self.results_frame.grid(row=3, column=0, sticky="nsew", pady=15)  # Increased padding
         
-        # Create a progress bar for showing processing status
-        self.progress_var = tk.DoubleVar()
-        self.progress_bar = ttk.Progressbar(
-            content_frame,
-            orient="horizontal",
-            length=100,
-            mode="indeterminate",
-            variable=self.progress_var
+        self.result_text = scrolledtext.ScrolledText(
+            self.results_frame, 
+            wrap=tk.WORD,
+            font="AppBody",  # Increased font size
+            insertontime=0,  # Read-only pane: no cursor blink timer
+            state="disabled"
         )
-        self.progress_bar.pack(fill=tk.X, pady=(5, 0))
-        self.progress_bar.pack_forget()  # Hide initially
+        self.result_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)  # Increased padding
+        self.result_text.tag_configure("heading", font="AppHeading")
     
     def _create_status_bar(self):
         """Create a status bar at the bottom of the window."""
+        self.status_var = tk.StringVar()
         self.status_bar = ttk.Label(
             self.root, 
-            text="", 
+            textvariable=self.status_var, 
             relief=tk.SUNKEN, 
             anchor=tk.W,
             padding=(5, 2)
@@ -263,7 +436,58 @@ For proper security, consider one of these solutions:
         Args:
             message: The message to display in the status bar
         """
-        self.status_bar.config(text=message)
+        self.status_var.set(message)
+    
+    def _set_text_widget(self, widget, new_text):
+        """Set a Text widget's content, rewriting only what changed.
+        
+        Text sharing a prefix with the current content, such as the final
+        transcription after streamed segments, leaves that prefix untouched.
+        
+        Args:
+            widget: The Text widget to update
+            new_text: The full new content
+        """
+        old_text = widget.get("1.0", "end-1c")
+        prefix_len = len(os.path.commonprefix([old_text, new_text]))
+        
+        if prefix_len == len(old_text):
+            widget.insert("end-1c", new_text[prefix_len:])
+        else:
+            widget.replace(f"1.0+{prefix_len}c", "end-1c", new_text[prefix_len:])
+    
+    def _on_ui_thread(self, callback):
+        """Wrap a callback so calls from worker threads run on the Tk thread.
+        
+        Args:
+            callback: Function to run on the Tk thread
+        
+        Returns:
+            A function that schedules ``callback`` with its arguments
+        """
+        def _post(*args):
+            self.root.after_idle(callback, *args)
+        return _post
+    
+    def _show_warning(self, message, duration_ms=2000):
+        """Show an inline warning that hides itself after a short delay.
+        
+        Args:
+            message: The warning text to display
+            duration_ms: How long to keep the warning visible
+        """
+        self.warning_label.configure(text=message)
+        self.warning_label.grid()
+        
+        # Restart the hide timer if a warning is already showing
+        if self._warning_after_id is not None:
+            self.root.after_cancel(self._warning_after_id)
+        self._warning_after_id = self.root.after(duration_ms, self._hide_warning)
+    
+    def _hide_warning(self):
+        """Hide the inline warning."""
+        self._warning_after_id = None
+        self.warning_label.grid_remove()
     
     def _show_processing(self, is_processing=True):
         """Show or hide the processing indicator.
@@ -271,27 +495,84 @@ For proper security, consider one of these solutions:
         Args:
             is_processing: Whether processing is in progress
         """
+        # Nothing to do if the indicator is already in the requested state
+        if is_processing == self._processing_active:
+            return
+        self._processing_active = is_processing
+        
         if is_processing:
-            self.progress_bar.pack(fill=tk.X, pady=(5, 0))
-            self.progress_bar.start(10)
+            self.processing_frame.grid()
             self.ok_button.state(["disabled"])
             self.record_button.state(["disabled"])
         else:
-            self.progress_bar.stop()
-            self.progress_bar.pack_forget()
+            self.processing_frame.grid_remove()
+            self.progress_bar.grid_remove()
             self.ok_button.state(["!disabled"])
             self.record_button.state(["!disabled"])
     
+    def _create_transcriber(self, model_name):
+        """Create a transcriber for the given model with the configured device.
+        
+        Args:
+            model_name: Whisper model name, or None for the default
+        
+        Returns:
+            The new Transcriber
+        """
+        return Transcriber(
+            model_name=model_name,
+            compute_type=WHISPER_COMPUTE_TYPE,
+            device=WHISPER_DEVICE,
+            # Not the output language radio: that sets the answer language,
+            # not the one spoken in the meeting
+            language=WHISPER_LANGUAGE
+        )
+    
+    def _on_model_selected(self, event=None):
+        """Switch to the speech model picked in the dropdown.
+        
+        Args:
+            event: The Tk event (unused)
+        """
+        model_name = self.model_var.get()
+        if model_name == self.transcriber.model_name:
+            return
+        
+        # The model can't change under a running recording or load
+        if self.state != AppState.IDLE or self._model_loading:
+            self.model_var.set(self.transcriber.model_name)
+            self._show_warning("Please wait for the current task before switching models.")
+            return
+        
+        self.transcriber.close()
+        self.transcriber = self._create_transcriber(model_name)
+        self.model_loaded = False
+        if PRELOAD_WHISPER:
+            self._start_model_load()
+        else:
+            self._update_status(f"Click Record to load the '{model_name}' speech model.")
+    
+    def _start_model_load(self):
+        """Start loading the Whisper model in the background."""
+        self._model_loading = True
+        self.record_button.state(["disabled"])
+        self._update_status(
+            f"Initializing... Loading speech recognition model on {self.transcriber.device}..."
+        )
+        self.transcriber.load_model(callback=self._on_ui_thread(self._on_model_loaded))
+    
     def _on_model_loaded(self, success):
         """Callback for when the Whisper model is loaded.
         
         Args:
             success: Boolean indicating if the model loaded successfully
         """
+        self._model_loading = False
         if success:
             self.model_loaded = True
-            self._update_status("Ready. Press 'Listen to question' to start recording.")
-            self.record_button.state(["!disabled"])
+            self._update_status("Warming up speech recognition model...")
+            if not self.transcriber.warm_up(callback=self._on_ui_thread(self._on_warm_up_complete)):
+                self._on_warm_up_complete(False)
         else:
             self._update_status("Error loading speech recognition model. Check console for details.")
             messagebox.showerror(
@@ -299,16 +580,74 @@ For proper security, consider one of these solutions:
                 "Failed to load the speech recognition model. Please restart the application."
             )
     
+    def _on_warm_up_complete(self, success):
+        """Callback for when the model warm-up transcription has finished.
+        
+        A failed warm-up is not fatal; the first recording just runs cold.
+        
+        Args:
+            success: Boolean indicating if the warm-up succeeded
+        """
+        self._update_status("Ready. Press 'Listen to question' to start recording.")
+        self.record_button.state(["!disabled"])
+    
+    def _on_transcription_segment(self, segment_text, segment_end):
+        """Callback for each segment decoded while transcription runs.
+        
+        Called on the transcription thread. Segments are queued and drawn
+        together at most every 50 ms, so a burst costs one Tk redraw.
+        
+        Args:
+            segment_text: Text of the newly decoded segment
+            segment_end: Time in seconds where the segment ends in the audio
+        """
+        with self._segment_lock:
+            self._pending_segments.append((segment_text, segment_end))
+            schedule = not self._segment_flush_scheduled
+            self._segment_flush_scheduled = True
+        
+        # Outside the lock: the Tk call waits for the Tk thread, which takes
+        # the same lock when it flushes
+        if schedule:
+            self._segment_after_id = self.root.after(50, self._flush_segments)
+    
+    def _flush_segments(self):
+        """Append the queued segments to the text box (runs on the UI thread)."""
+        with self._segment_lock:
+            segments = self._pending_segments
+            self._pending_segments = []
+            self._segment_flush_scheduled = False
+            self._segment_after_id = None
+        
+        if not segments:
+            return
+        
+        self.text_box.insert(tk.END, "".join(text for text, _ in segments))
+        self.text_box.see(tk.END)
+        
+        segment_end = segments[-1][1]
+        if self._transcription_span is not None:
+            start, end = self._transcription_span
+            fraction = (segment_end - start) / max(end - start, 1e-6)
+            self.progress_var.set(int(1000 * min(max(fraction, 0.0), 1.0)))
+    
     def _on_transcription_complete(self, text):
         """Callback for when transcription is complete.
         
         Args:
             text: The transcribed text or None if an error occurred
         """
+        # The full text supersedes any segments still waiting to be drawn
+        with self._segment_lock:
+            self._pending_segments = []
+            self._segment_flush_scheduled = False
+            after_id, self._segment_after_id = self._segment_after_id, None
+        if after_id is not None:
+            self.root.after_cancel(after_id)
+        
         if text is not None:
-            # Update the text box with the transcribed text
-            self.text_box.delete(1.0, tk.END)
-            self.text_box.insert(tk.END, text)
+            # Tidy up the streamed segments; only the changed tail is rewritten
+            self._set_text_widget(self.text_box, text)
             self._update_status("Transcription complete. Edit the text if needed.")
         else:
             self._update_status("Error transcribing audio. Please try again.")
@@ -317,153 +656,215 @@ For proper security, consider one of these solutions:
                 "Failed to transcribe the audio. Please try recording again."
             )
         
-        # Hide processing indicator
+        # Hide processing indicator (this also re-enables the buttons)
+        self.state = AppState.IDLE
         self._show_processing(False)
-        
-        # Enable the record button
-        self.record_button.state(["!disabled"])
     
     def _record_audio(self):
         """Record audio from the microphone and transcribe it."""
-        # Check if the model is loaded
+        # Check if the model is loaded; the first click starts loading it
         if not self.model_loaded:
+            if not self._model_loading:
+                self._start_model_load()
+                return
             messagebox.showinfo(
                 "Model Loading", 
                 "Please wait for the speech recognition model to finish loading."
             )
             return
         
-        # Toggle recording state
-        self.is_recording = not self.is_recording
-        
-        if self.is_recording:
-            # Start recording
-            self.record_button.configure(text="⏹️ Stop Recording")
-            self._update_status("Recording... Speak now.")
+        if self.state == AppState.IDLE:
+            # Start recording; the button stays disabled until it is running
+            self.state = AppState.STARTING
+            self.record_button.state(["disabled"])
             
-            # Start actual recording
             success = self.audio_recorder.start_recording(max_duration=60)
-            if not success:
-                self.is_recording = False
-                self.record_button.configure(text="🎙️ Listen to question")
+            self.record_button.state(["!disabled"])
+            if success:
+                self.state = AppState.RECORDING
+                self.record_text_var.set("⏹️ Stop Recording")
+                self._update_status("Recording... Speak now.")
+            else:
+                self.state = AppState.IDLE
                 self._update_status("Error starting recording. Please try again.")
                 messagebox.showerror(
                     "Recording Error", 
                     "Failed to start recording. Please check your microphone and try again."
                 )
-        else:
+        elif self.state == AppState.RECORDING:
             # User manually stopped recording
             self._finish_recording()
+        # Clicks while starting, stopping or transcribing are ignored
     
     def _finish_recording(self):
         """Finish the recording process and start transcription."""
         # Stop recording state
-        self.is_recording = False
-        self.record_button.configure(text="🎙️ Listen to question")
+        self.state = AppState.STOPPING
+        self.record_text_var.set("🎙️ Listen to question")
         
-        # Show processing indicator
+        # Show processing indicator (this also disables the buttons)
         self._show_processing(True)
         
-        # Temporarily disable the record button during processing
-        self.record_button.state(["disabled"])
-        
         # Stop the recording and get the audio file
         self.audio_file = self.audio_recorder.stop_recording()
         
         if self.audio_file:
+            speech_bounds = self.audio_recorder.get_speech_bounds()
+            if speech_bounds is None:
+                self.state = AppState.IDLE
+                self._update_status("No speech detected. Please try again.")
+                self._show_processing(False)
+                return
+            
             self._update_status("Recording finished. Transcribing audio...")
             
-            # Start transcription
+            # Start transcription of the speech region only; segments are
+            # shown as they are decoded
+            self.text_box.delete(1.0, tk.END)
+            clip_start, clip_end = speech_bounds
+            self._transcription_span = speech_bounds
+            self.progress_var.set(0)
+            self.progress_bar.grid()
+            audio = self.audio_recorder.get_last_recording_audio()
+            if audio is None or self.audio_recorder.sample_rate != 16000:
+                audio = self.audio_file
             success = self.transcriber.transcribe(
-                self.audio_file,
-                callback=self._on_transcription_complete
+                audio,
+                callback=self._on_ui_thread(self._on_transcription_complete),
+                clip_start=clip_start,
+                clip_end=clip_end,
+                segment_callback=self._on_transcription_segment
             )
             
-            if not success:
+            if success:
+                self.state = AppState.TRANSCRIBING
+            else:
+                self.state = AppState.IDLE
                 self._update_status("Error starting transcription. Please try again.")
                 self._show_processing(False)
-                self.record_button.state(["!disabled"])
                 messagebox.showerror(
                     "Transcription Error", 
                     "Failed to start transcription. Please try recording again."
                 )
         else:
+            self.state = AppState.IDLE
             self._update_status("Error saving recording. Please try again.")
             self._show_processing(False)
-            self.record_button.state(["!disabled"])
             messagebox.showerror(
                 "Recording Error", 
                 "Failed to save the recording. Please try again."
             )
     
     def _process_question(self):
-        """Process the question text and generate an answer.
+        """Answer the question in the text box in the selected language.
         
-        This is a placeholder. Actual implementation will be added in Task 5.
+        Repeated questions are answered from the cache; others are queued on
+        the answer generator and shown by ``_on_answer_ready`` when ready.
         """
         question = self.text_box.get(1.0, tk.END).strip()
         language_code = self.language_var.get()
         
         # Show language name in the UI
-        language_map = {"en": "English", "ja": "Japanese", "vi": "Vietnamese"}
-        language_name = language_map.get(language_code, "Unknown")
-        
-        # Update the target language frame title
-        self.target_lang_frame.configure(text=language_name)
+        language_name = self._LANGUAGE_MAP.get(language_code, "Unknown")
         
         # Check if question is empty
         if not question:
-            messagebox.showwarning(
-                "Empty Question", 
-                "Please provide a question to process."
-            )
+            self._show_warning("Please provide a question to process.")
+            return
+        
+        self._ensure_results_ui()
+        
+        # Repeated questions are answered from the cache straight away
+        cached = self._answer_generator.get_cached(question, language_code)
+        if cached is not None:
+            self._current_question_uid = None
+            self._update_results(*cached, language_name)
             return
         
         # Show processing indicator
         self._show_processing(True)
         self._update_status(f"Processing question in {language_name}...")
         
-        # Simulate processing delay (this would be a real API call in the full implementation)
-        threading.Thread(target=self._simulate_processing, args=(question, language_code)).start()
+        # Queue the question; answers to superseded questions are ignored
+        self._current_question_uid = self._answer_generator.submit(
+            question, language_code, callback=self._on_answer_ready
+        )
     
-    def _simulate_processing(self, question, language_code):
-        """Simulate the processing of the question (temporary placeholder).
+    def _on_answer_ready(self, uid, language_code, vi_answer, lang_answer):
+        """Callback for when the answer generator has answered a question.
+        
+        Runs on the worker thread and hands the answer to the UI through
+        ``_post_results``.
         
         Args:
-            question: The question text to process
+            uid: Id returned when the question was submitted
             language_code: The target language code
+            vi_answer: The answer in Vietnamese, or None on error
+            lang_answer: The answer in the target language, or None on error
         """
-        # Simulate processing delay
-        time.sleep(2)
+        if uid != self._current_question_uid:
+            return
         
-        # Generate placeholder results
-        vi_answer = f"[Giả lập] Thủ đô của Pháp là Paris. Đây là một thành phố lịch sử và văn hóa."
+        language_name = self._LANGUAGE_MAP.get(language_code, "Unknown")
+        self._post_results(vi_answer, lang_answer, language_name)
+    
+    def _post_results(self, vi_answer, lang_answer, language_name):
+        """Queue results from a worker thread for display on the UI thread.
         
-        # Different answers based on language
-        if language_code == "en":
-            lang_answer = f"[Simulated] The capital of France is Paris. It is a historical and cultural city."
-        elif language_code == "ja":
-            lang_answer = f"[シミュレーション] フランスの首都はパリです。それは歴史的で文化的な都市です。"
-        else:  # Vietnamese
-            lang_answer = vi_answer
+        Posts arriving before the UI has flushed overwrite each other, so a
+        burst of updates costs a single Tk refresh.
         
-        # Update UI in the main thread
-        self.root.after(0, lambda: self._update_results(vi_answer, lang_answer))
+        Args:
+            vi_answer: The answer in Vietnamese
+            lang_answer: The answer in the target language
+            language_name: Display name of the target language
+        """
+        with self._pending_lock:
+            self._pending["vi_answer"] = vi_answer
+            self._pending["lang_answer"] = lang_answer
+            self._pending["language_name"] = language_name
+            schedule = not self._flush_scheduled
+            self._flush_scheduled = True
+        
+        if schedule:
+            self._flush_after_id = self.root.after_idle(self._flush_pending)
+    
+    def _flush_pending(self):
+        """Display the latest results posted by workers (runs on the UI thread)."""
+        with self._pending_lock:
+            pending = self._pending
+            self._pending = {}
+            self._flush_scheduled = False
+            self._flush_after_id = None
+        
+        if pending:
+            self._update_results(**pending)
     
-    def _update_results(self, vi_answer, lang_answer):
+    def _update_results(self, vi_answer, lang_answer, language_name="Target Language"):
         """Update the results display with the generated answers.
         
         Args:
-            vi_answer: The answer in Vietnamese
+            vi_answer: The answer in Vietnamese, or None if generation failed
             lang_answer: The answer in the target language
+            language_name: Display name of the target language
         """
-        # Clear previous results
-        self.vi_text.delete(1.0, tk.END)
-        self.lang_text.delete(1.0, tk.END)
+        if vi_answer is None:
+            self._show_processing(False)
+            self._update_status("Error generating the answer. Please try again.")
+            return
         
-        # Display new results
-        self.vi_text.insert(tk.END, vi_answer)
-        self.lang_text.insert(tk.END, lang_answer)
+        # Replace previous results in one call, each answer under its own heading.
+        # The pane is read-only, so it is only writable for this update.
+        self.result_text.configure(state="normal")
+        self.result_text.replace(
+            1.0, tk.END,
+            "Vietnamese\n", "heading",
+            vi_answer, "vi",
+            "\n\n", (),
+            f"{language_name}\n", "heading",
+            lang_answer, "lang"
+        )
+        self.result_text.configure(state="disabled")
         
         # Hide processing indicator
         self._show_processing(False)
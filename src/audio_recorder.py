@@ -8,13 +8,18 @@ Provides functionality to record audio from the microphone and save it to a file
 """
 
 import os
+import itertools
 import tempfile
 import sounddevice as sd
+import soundfile as sf
 import numpy as np
-import wave
 import threading
 import time
-import queue
+
+# Energy-based speech detection: 10 ms frames, RMS threshold, padding
+_VAD_FRAME_MS = 10
+_VAD_THRESHOLD = 0.01
+_VAD_PADDING_S = 0.2
 
 class AudioRecorder:
     """Class for recording audio from the microphone."""
@@ -29,11 +34,119 @@ class AudioRecorder:
         self.sample_rate = sample_rate
         self.channels = channels
         self.recording = False
-        self.frames = []
-        self.temp_dir = tempfile.gettempdir()
+        # Prefer RAM-backed storage for the WAV; Whisper reads the in-memory
+        # samples anyway, so the file is only kept as a fallback. Only the
+        # latest recording is kept; see _remove_last_recording
+        if os.path.isdir("/dev/shm"):
+            self.temp_dir = "/dev/shm"
+        else:
+            self.temp_dir = tempfile.gettempdir()
+        # Recording filenames: a counter instead of the clock, so two
+        # recordings in the same second don't overwrite each other
+        self._pid = os.getpid()
+        self._recording_counter = itertools.count()
         self.audio_filename = None
-        self._data_queue = queue.Queue()
+        self.speech_bounds = None
+        self.audio_data = None
+        # Preallocated int16 recording buffer filled by the stream callback.
+        # The callback is the only writer and publishes each block by storing
+        # _write_idx last, so readers never need a lock.
+        self._buf = None
+        self._write_idx = 0
+        # PortAudio status flags (e.g. input overflow) seen while recording
+        self._status_count = 0
+        self._last_status = None
+        self._mono = None
+        self._analyzed_idx = 0
+        self._first_voiced = None
+        self._last_voiced = None
+        # WAV file written while recording; see _flush_wav
+        self._wf = None
+        self._wav_path = None
+        self._flushed_idx = 0
+        self._wav_ok = True
         self._recording_thread = None
+        self._stop_event = threading.Event()
+        self._stream = None
+    
+    def __enter__(self):
+        """Use the recorder as a context manager that closes the stream."""
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+    
+    def _ensure_stream(self):
+        """Open the input stream on first use and keep it running.
+        
+        Reusing one stream avoids the PortAudio setup cost on every recording;
+        the callback simply ignores audio while no recording is in progress.
+        """
+        if self._stream is not None:
+            return
+        
+        stream = sd.InputStream(
+            samplerate=self.sample_rate,
+            channels=self.channels,
+            dtype="int16",
+            # 50 ms blocks: few callbacks per second, little audio
+            # still in flight when a recording stops
+            blocksize=int(self.sample_rate * 0.05),
+            callback=self._on_audio
+        )
+        stream.start()
+        self._stream = stream
+    
+    def _on_audio(self, indata, frames, time_info, status):
+        """Copy a block from the input stream into the recording buffer.
+        
+        Args:
+            indata: Int16 samples, shape (frames, channels)
+            frames: Number of frames in the block
+            time_info: PortAudio timing information (unused)
+            status: PortAudio status flags
+        """
+        if not self.recording:
+            return
+        if status:
+            # No printing on the audio thread; reported when recording stops
+            self._status_count += 1
+            self._last_status = status
+        
+        buf = self._buf
+        idx = self._write_idx
+        # Drop whatever doesn't fit once max_duration is reached
+        n = min(len(indata), len(buf) - idx)
+        if n <= 0:
+            return
+        # PortAudio already delivers int16, so this is a plain copy
+        buf[idx:idx + n] = indata[:n]
+        self._write_idx = idx + n
+    
+    def close(self):
+        """Stop any recording and release the microphone."""
+        if self.recording or self._wf is not None:
+            self.stop_recording()
+        
+        if self._stream is not None:
+            try:
+                self._stream.close()
+            except Exception as e:
+                print(f"Error closing audio stream: {e}")
+            self._stream = None
+        
+        self._remove_last_recording()
+    
+    def _remove_last_recording(self):
+        """Delete the previous recording's WAV so files don't pile up in RAM."""
+        if self.audio_filename is None:
+            return
+        try:
+            os.remove(self.audio_filename)
+        except OSError:
+            pass
+        self.audio_filename = None
     
     def start_recording(self, max_duration=10):
         """Start recording audio from the microphone.
@@ -47,10 +160,53 @@ class AudioRecorder:
         if self.recording:
             return False
         
-        self.frames = []
+        try:
+            self._ensure_stream()
+        except Exception as e:
+            print(f"Error recording audio: {e}")
+            return False
+        
+        self._remove_last_recording()
+        
+        # Open the WAV now so it can be written while the recording runs
+        filename = os.path.join(
+            self.temp_dir, 
+            f"recording_{self._pid}_{next(self._recording_counter)}.wav"
+        )
+        try:
+            wf = sf.SoundFile(
+                filename, 'w',
+                samplerate=self.sample_rate,
+                channels=self.channels,
+                format='WAV',
+                subtype='PCM_16'  # 16-bit audio
+            )
+        except Exception as e:
+            print(f"Error saving audio: {e}")
+            return False
+        
+        # One buffer for the whole recording, so blocks are written in place;
+        # kept for the next recording of the same length. The mono copy is
+        # not reused because get_last_recording_audio hands it out.
+        shape = (int(self.sample_rate * max_duration), self.channels)
+        if self._buf is None or self._buf.shape != shape:
+            self._buf = np.empty(shape, dtype=np.int16)
+        self._write_idx = 0
+        self._status_count = 0
+        self._last_status = None
+        # Mono float32 copy and speech scan, filled in as audio arrives
+        self._mono = np.empty(len(self._buf), dtype=np.float32)
+        self._analyzed_idx = 0
+        self._first_voiced = None
+        self._last_voiced = None
+        self._wf = wf
+        self._wav_path = filename
+        self._flushed_idx = 0
+        self._wav_ok = True
+        self._stop_event.clear()
         self.recording = True
         
-        # Start the recording in a separate thread
+        # Enforce the maximum duration in a separate thread
         self._recording_thread = threading.Thread(
             target=self._record_audio,
             args=(max_duration,)
@@ -63,83 +219,160 @@ class AudioRecorder:
     def stop_recording(self):
         """Stop the current recording.
         
+        Also finishes a recording that already stopped at max_duration.
+        
         Returns:
             Path to the saved audio file or None if no recording
         """
-        if not self.recording:
+        if not self.recording and self._wf is None:
             return None
         
         self.recording = False
+        self._stop_event.set()
         
         # Wait for the recording thread to finish
         if self._recording_thread and self._recording_thread.is_alive():
             self._recording_thread.join()
         
-        # Get all remaining data from the queue
-        while not self._data_queue.empty():
-            self.frames.append(self._data_queue.get())
-        
         return self._save_audio()
     
     def _record_audio(self, max_duration):
-        """Record audio from the microphone for the specified duration.
+        """Keep recording until stopped or the duration is reached.
+        
+        The WAV is written here as audio arrives, so little is left to write
+        when the recording stops.
         
         Args:
             max_duration: Maximum duration in seconds
         """
-        # Function to handle incoming audio data
-        def callback(indata, frames, time, status):
-            if status:
-                print(f"Recording status: {status}")
-            self._data_queue.put(indata.copy())
+        deadline = time.monotonic() + max_duration
+        while self.recording:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            # Work every 100ms; stop_recording wakes this immediately
+            if self._stop_event.wait(min(0.1, remaining)):
+                break
+            self._flush_wav()
+            self._analyze()
         
-        # Start the recording stream
+        # Stop recording
+        self.recording = False
+    
+    def _flush_wav(self):
+        """Append the samples recorded since the last flush to the WAV file."""
+        if self._wf is None or not self._wav_ok:
+            return
+        
+        # Rows before end are never written again
+        end = self._write_idx
         try:
-            with sd.InputStream(samplerate=self.sample_rate, 
-                              channels=self.channels, 
-                              callback=callback):
-                start_time = time.time()
-                while self.recording and (time.time() - start_time) < max_duration:
-                    # Check every 100ms if we should stop
-                    time.sleep(0.1)
-                    
-                # Stop recording
-                self.recording = False
+            self._wf.write(self._buf[self._flushed_idx:end])
+            self._flushed_idx = end
         except Exception as e:
-            print(f"Error recording audio: {e}")
-            self.recording = False
+            print(f"Error saving audio: {e}")
+            self._wav_ok = False
     
     def _save_audio(self):
-        """Save the recorded audio frames to a WAV file.
+        """Finish the WAV file and keep the recorded samples.
         
         Returns:
             Path to the saved audio file or None if no frames
         """
-        if not self.frames:
+        if self._wf is None:
             return None
         
-        # Convert the list of NumPy arrays to a single array
-        data = np.concatenate(self.frames, axis=0)
+        if self._status_count:
+            print(f"Recording status: {self._last_status} ({self._status_count} blocks)")
         
-        # Generate a unique filename based on timestamp
-        filename = os.path.join(
-            self.temp_dir, 
-            f"recording_{int(time.time())}.wav"
-        )
-        
-        # Save as WAV file
+        self._flush_wav()
         try:
-            with wave.open(filename, 'wb') as wf:
-                wf.setnchannels(self.channels)
-                wf.setsampwidth(2)  # 16-bit audio
-                wf.setframerate(self.sample_rate)
-                wf.writeframes((data * 32767).astype(np.int16).tobytes())
-            
-            self.audio_filename = filename
-            return filename
+            self._wf.close()
         except Exception as e:
             print(f"Error saving audio: {e}")
+            self._wav_ok = False
+        self._wf = None
+        
+        n_samples = self._write_idx
+        if n_samples == 0 or not self._wav_ok:
+            try:
+                os.remove(self._wav_path)
+            except OSError:
+                pass
             return None
+        
+        # Keep a mono float32 copy so Whisper can skip decoding the WAV again
+        self._analyze(final=True)
+        self.audio_data = self._mono[:n_samples]
+        if self._first_voiced is None:
+            self.speech_bounds = None
+        else:
+            self.speech_bounds = self._speech_bounds(
+                self._first_voiced, self._last_voiced, n_samples,
+                self.sample_rate * _VAD_FRAME_MS // 1000, _VAD_PADDING_S
+            )
+        
+        self.audio_filename = self._wav_path
+        return self._wav_path
+    
+    def _analyze(self, final=False):
+        """Mix new samples to mono float32 and scan them for speech.
+        
+        Runs on the timer thread while recording, so only the last few blocks
+        are left to process when the recording stops.
+        
+        Args:
+            final: Also process a trailing partial frame
+        """
+        frame_len = self.sample_rate * _VAD_FRAME_MS // 1000
+        start = self._analyzed_idx
+        end = self._write_idx
+        if not final:
+            end = start + (end - start) // frame_len * frame_len
+        if end <= start:
+            return
+        
+        mono = self._mono[start:end]
+        np.mean(self._buf[start:end], axis=1, dtype=np.float32, out=mono)
+        mono /= 32767
+        self._analyzed_idx = end
+        
+        voiced = self._voiced_frames(mono, frame_len, _VAD_THRESHOLD)
+        if voiced.size:
+            offset = start // frame_len
+            if self._first_voiced is None:
+                self._first_voiced = offset + voiced[0]
+            self._last_voiced = offset + voiced[-1]
+    
+    def _voiced_frames(self, samples, frame_len, threshold):
+        """Indices of the complete frames whose RMS level exceeds threshold."""
+        n_frames = len(samples) // frame_len
+        frames = samples[:n_frames * frame_len].reshape(n_frames, frame_len)
+        rms = np.sqrt(np.mean(frames ** 2, axis=1))
+        return np.flatnonzero(rms > threshold)
+    
+    def _speech_bounds(self, first, last, n_samples, frame_len, padding_s):
+        """Turn the first and last voiced frames into padded (start, end) seconds."""
+        duration = n_samples / self.sample_rate
+        start = max(0.0, first * frame_len / self.sample_rate - padding_s)
+        end = min(duration, (last + 1) * frame_len / self.sample_rate + padding_s)
+        return start, end
+    
+    def get_speech_bounds(self):
+        """Get the speech region detected in the last recording.
+        
+        Returns:
+            A (start, end) tuple in seconds, or None if it held no speech
+        """
+        return self.speech_bounds
+    
+    def get_last_recording_audio(self):
+        """Get the samples of the last recording.
+        
+        Returns:
+            Mono float32 samples in [-1, 1] at ``sample_rate``, or None
+        """
+        return self.audio_data
     
     def get_last_recording_path(self):
         """Get the path to the last recorded audio file.
@@ -9,6 +9,7 @@ This module provides a function to fix SSL certificate verification issues on ma
 
 import os
 import sys
+import glob
 import subprocess
 import ssl
 
@@ -50,14 +51,16 @@ def fix_mac_certificates():
         
         for path_pattern in possible_paths:
             try:
-                # Use subprocess to find the actual path
-                cert_paths = subprocess.check_output(f"ls {path_pattern}", shell=True).decode().strip().split('\n')
+                # Expand the pattern in-process instead of spawning a shell;
+                # sorted like ls, so the same script is picked every time
+                cert_paths = sorted(glob.glob(path_pattern))
                 if cert_paths:
                     # Run the first found certificate installation script
-                    subprocess.run(cert_paths[0], shell=True, check=True)
+                    subprocess.run([cert_paths[0]], check=True)
                     print(f"Successfully ran certificate installation script: {cert_paths[0]}")
                     return True
-            except (subprocess.SubprocessError, FileNotFoundError):
+            except (subprocess.SubprocessError, OSError):
+                # OSError also covers a script that isn't executable
                 continue
         
         # If all else fails, use the insecure fallback (not recommended for production)
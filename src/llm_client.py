@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+LLM Client Module
+
+Answers questions with the OpenAI API from a background asyncio loop, so the
+questions of a batch are sent concurrently over one pooled HTTP client.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+from openai import AsyncOpenAI
+
+_SYSTEM_PROMPT = (
+    "You are a meeting assistant. Answer the question concisely in Vietnamese."
+)
+
+
+class LLMClient:
+    """Class for answering questions with an OpenAI chat model."""
+    
+    def __init__(self, api_key, model="gpt-4o-mini", timeout=30.0):
+        """Initialize the client and start its event loop thread.
+        
+        Args:
+            api_key: OpenAI API key
+            model: Chat model used to answer questions
+            timeout: Seconds to wait for a batch of answers
+        """
+        self.model = model
+        self.timeout = timeout
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever,
+            name="ask-away-llm",
+            daemon=True
+        )
+        self._thread.start()
+        # Batches waiting for answers, cancelled by close()
+        self._futures = set()
+        self._futures_lock = threading.Lock()
+        # One client for the process lifetime keeps connections alive
+        self._client = AsyncOpenAI(api_key=api_key)
+    
+    def generate_batch(self, batch):
+        """Answer a batch of questions concurrently (blocking).
+        
+        Args:
+            batch: List of (question, language_code) tuples
+        
+        Returns:
+            A list of Vietnamese answers, one per question
+        """
+        future = asyncio.run_coroutine_threadsafe(self._answer_all(batch), self._loop)
+        with self._futures_lock:
+            self._futures.add(future)
+        try:
+            return future.result(timeout=self.timeout)
+        except concurrent.futures.TimeoutError:
+            # Stop the requests instead of leaving them running on the loop
+            future.cancel()
+            raise
+        finally:
+            with self._futures_lock:
+                self._futures.discard(future)
+    
+    def close(self):
+        """Cancel pending answers, close the HTTP client and stop the loop thread."""
+        if self._loop.is_closed():
+            return
+        
+        # Unblocks generate_batch, so the worker thread doesn't hold up exit
+        with self._futures_lock:
+            futures = list(self._futures)
+        for future in futures:
+            future.cancel()
+        
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout=5)
+        except Exception as e:
+            print(f"Error closing LLM client: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        # A running loop can't be closed; the daemon thread dies with the process
+        if not self._thread.is_alive():
+            self._loop.close()
+    
+    async def _shutdown(self):
+        """Let cancelled requests unwind, then close the HTTP client."""
+        tasks = asyncio.all_tasks() - {asyncio.current_task()}
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._client.close()
+    
+    async def _answer_all(self, batch):
+        """Send every question of a batch at once.
+        
+        Args:
+            batch: List of (question, language_code) tuples
+        
+        Returns:
+            A list of answers in batch order
+        """
+        return await asyncio.gather(
+            *(self._call_llm(question) for question, _ in batch)
+        )
+    
+    async def _call_llm(self, question):
+        """Ask the model a single question.
+        
+        Args:
+            question: The question text
+        
+        Returns:
+            The answer in Vietnamese; empty if the model gave no text
+        """
+        response = await self._client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": _SYSTEM_PROMPT},
+                {"role": "user", "content": question},
+            ]
+        )
+        # content is None for refusals and tool calls
+        return (response.choices[0].message.content or "").strip()
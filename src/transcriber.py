@@ -4,47 +4,177 @@
 """
 Speech-to-Text Transcription Module
 
-Provides functionality to transcribe audio files to text using Whisper.
+Provides functionality to transcribe audio files to text using Whisper,
+running on the faster-whisper (CTranslate2) backend.
 """
 
 import os
 import threading
-import whisper
+from concurrent.futures import ThreadPoolExecutor
+import ctranslate2
+import numpy as np
 import time
 import ssl
-import urllib.request
-import tempfile
 import sys
 
+
+# Persistent download location for model weights
+_DEFAULT_CACHE_DIR = os.path.join(
+    os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+    "ask-away",
+    "whisper"
+)
+
+# The most recently loaded model, shared by transcribers with the same
+# (model source, device, device index, compute type) key
+_MODEL_CACHE = {}
+_MODEL_CACHE_LOCK = threading.Lock()
+
+# On macOS, ensure certificate verification works for model downloads or use
+# a workaround; done once at import instead of on every load
+if sys.platform == 'darwin':
+    try:
+        # Try to install certificates for Python on macOS
+        import certifi
+        os.environ.setdefault('SSL_CERT_FILE', certifi.where())
+    except ImportError:
+        # If certifi is not available, use a less secure workaround
+        # NOTE: This is only for development purposes, not recommended for production
+        ssl._create_default_https_context = ssl._create_unverified_context
+        print("Warning: Using unverified HTTPS context. This is not secure for production.")
+
+
+def _default_device():
+    """Pick the device Whisper should run on.
+    
+    CTranslate2 has no Metal/MPS backend, so this is either CUDA or CPU.
+    
+    Returns:
+        "cuda" when a CUDA device is available, otherwise "cpu"
+    """
+    if ctranslate2.get_cuda_device_count() > 0:
+        return "cuda"
+    return "cpu"
+
+
+def _default_model(language, device):
+    """Pick a Whisper model that balances speed and accuracy.
+    
+    Args:
+        language: Language spoken in the recordings, or None if unknown
+        device: The device the model will run on ("cuda" or "cpu")
+    
+    Returns:
+        "distil-small.en" for English, "large-v3-turbo" on CUDA, otherwise
+        "small"
+    """
+    if language == "en":
+        return "distil-small.en"
+    if device == "cuda":
+        return "large-v3-turbo"
+    return "small"
+
+
+def _default_compute_type(device):
+    """Pick the fastest CTranslate2 compute type the device supports.
+    
+    Args:
+        device: The device the model will run on ("cuda" or "cpu")
+    
+    Returns:
+        "int8_float16" (or "float16") on CUDA, "int8" on CPUs with int8
+        kernels, then half precision if supported, otherwise "float32"
+    """
+    if device == "cuda":
+        preferred = ("int8_float16", "float16", "int8_bfloat16", "bfloat16")
+    else:
+        preferred = ("int8", "bfloat16")
+    
+    supported = ctranslate2.get_supported_compute_types(device)
+    for compute_type in preferred:
+        if compute_type in supported:
+            return compute_type
+    return "float32"
+
+
 class Transcriber:
     """Class for transcribing audio to text using Whisper."""
     
-    def __init__(self, model_name=None, local_model_path=None):
-        import os
-        if model_name is None:
-            model_name = os.getenv("WHISPER_MODEL", "medium")
+    def __init__(self, model_name=None, local_model_path=None, compute_type=None,
+                 device=None, device_index=None, download_root=None, language=None):
         """Initialize the transcriber with the specified model.
         
         Args:
             model_name: Name of the Whisper model to use
-                (tiny, base, small, medium, large)
+                (tiny, base, small, medium, large-v3, distil-small.en, ...).
+                Defaults to WHISPER_MODEL or a model suited to ``language``.
             local_model_path: Optional path to a local model file or directory
                 If provided, this will be used instead of downloading the model
+            compute_type: CTranslate2 compute type (e.g. int8, int8_float16,
+                float16, float32). Defaults to WHISPER_COMPUTE_TYPE or the
+                fastest type supported by the device.
+            device: Device to run on ("cuda" or "cpu"). Defaults to
+                WHISPER_DEVICE or CUDA when available.
+            device_index: GPU index to use on multi-GPU hosts. Defaults to
+                WHISPER_DEVICE_INDEX or 0.
+            download_root: Directory downloaded models are kept in. Defaults
+                to WHISPER_CACHE_DIR or ~/.cache/ask-away/whisper.
+            language: Language code spoken in the recordings, used to pick
+                the default model
         """
+        if device is None:
+            device = os.getenv("WHISPER_DEVICE") or _default_device()
+        if model_name is None:
+            model_name = os.getenv("WHISPER_MODEL") or _default_model(language, device)
+        if device_index is None:
+            device_index = int(os.getenv("WHISPER_DEVICE_INDEX", "0"))
+        if compute_type is None:
+            compute_type = os.getenv("WHISPER_COMPUTE_TYPE") or _default_compute_type(device)
+        
         self.model_name = model_name
         self.local_model_path = local_model_path
+        self.device = device
+        self.device_index = device_index
+        self.compute_type = compute_type
         self.model = None
         self.is_loaded = False
         self.is_transcribing = False
-        self._load_thread = None
-        self._transcribe_thread = None
+        # Single worker for loading, warm-up and transcription, created on
+        # first use; see _submit
+        self._pool = None
+        self._load_future = None
+        self._future = None
         self._callback = None
         self._result = None
-        self._models_dir = os.path.join(tempfile.gettempdir(), "whisper_models")
+        self.download_root = download_root or os.getenv("WHISPER_CACHE_DIR") or _DEFAULT_CACHE_DIR
+    
+    def _submit(self, fn):
+        """Run fn on the transcriber's worker thread.
+        
+        One long-lived worker serves every call instead of a new thread per
+        recording; the model runs one task at a time anyway.
+        
+        Args:
+            fn: Function to run
         
-        # Create models directory if it doesn't exist
-        if not os.path.exists(self._models_dir):
-            os.makedirs(self._models_dir, exist_ok=True)
+        Returns:
+            The Future for the submitted task
+        """
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="transcriber")
+        return self._pool.submit(fn)
+    
+    def close(self):
+        """Shut down the worker thread, dropping tasks that haven't started."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+    
+    def _sentinel_path(self):
+        """Path of the marker written once the model has been downloaded."""
+        # Hub repo ids such as "Systran/faster-whisper-small" contain a slash
+        name = self.model_name.replace("/", "--")
+        return os.path.join(self.download_root, f".{name}.loaded")
     
     def load_model(self, callback=None):
         """Load the Whisper model in a background thread.
@@ -52,35 +182,34 @@ class Transcriber:
         Args:
             callback: Optional callback function to call when loading is complete
         """
-        if self.is_loaded or (self._load_thread and self._load_thread.is_alive()):
+        if self.is_loaded or (self._load_future and not self._load_future.done()):
             # Already loaded or loading
             return
         
         def _load():
             start_time = time.time()
             try:
-                # On macOS, ensure certificate verification works or use workaround
-                if sys.platform == 'darwin':
-                    try:
-                        # Try to install certificates for Python on macOS
-                        import certifi
-                        os.environ['SSL_CERT_FILE'] = certifi.where()
-                    except ImportError:
-                        # If certifi is not available, use a less secure workaround
-                        # NOTE: This is only for development purposes, not recommended for production
-                        ssl._create_default_https_context = ssl._create_unverified_context
-                        print("Warning: Using unverified HTTPS context. This is not secure for production.")
-                
                 # Use local model path if provided
                 if self.local_model_path and os.path.exists(self.local_model_path):
                     print(f"Loading model from local path: {self.local_model_path}")
-                    self.model = whisper.load_model(self.local_model_path)
+                    model_source = self.local_model_path
                 else:
-                    self.model = whisper.load_model(self.model_name)
+                    model_source = self.model_name
                 
+                key = (model_source, self.device, self.device_index, self.compute_type)
+                with _MODEL_CACHE_LOCK:
+                    model = _MODEL_CACHE.get(key)
+                    if model is None:
+                        # Keep only the active model; switching models
+                        # shouldn't leave every one tried in memory
+                        _MODEL_CACHE.clear()
+                        model = self._create_model(model_source)
+                        _MODEL_CACHE[key] = model
+                
+                self.model = model
                 self.is_loaded = True
                 load_time = time.time() - start_time
-                print(f"Whisper model '{self.model_name}' loaded in {load_time:.2f} seconds")
+                print(f"Whisper model '{self.model_name}' ({self.compute_type} on {self.device}) loaded in {load_time:.2f} seconds")
                 
                 if callback:
                     callback(True)
@@ -93,16 +222,117 @@ class Transcriber:
                 if callback:
                     callback(False)
         
-        self._load_thread = threading.Thread(target=_load)
-        self._load_thread.daemon = True
-        self._load_thread.start()
+        self._load_future = self._submit(_load)
+    
+    def _create_model(self, model_source):
+        """Create the WhisperModel, skipping the hub check once downloaded.
+        
+        Args:
+            model_source: Model name or local model path
+        
+        Returns:
+            The loaded WhisperModel
+        """
+        options = {
+            "device": self.device,
+            "device_index": self.device_index,
+            "compute_type": self.compute_type,
+            "download_root": self.download_root,
+        }
+        if model_source != self.model_name:
+            # Local model directory; nothing to download
+            return self._new_whisper_model(model_source, **options)
+        
+        sentinel = self._sentinel_path()
+        if os.path.exists(sentinel):
+            try:
+                return self._new_whisper_model(model_source, local_files_only=True, **options)
+            except Exception as e:
+                # Cached files went missing; fall back to downloading them
+                print(f"Cached Whisper model unusable, downloading again: {e}")
+        
+        model = self._new_whisper_model(model_source, **options)
+        try:
+            with open(sentinel, "w"):
+                pass
+        except OSError as e:
+            # Only costs a hub check next time; the model itself is fine
+            print(f"Could not mark Whisper model as downloaded: {e}")
+        return model
+    
+    def _new_whisper_model(self, model_source, **options):
+        """Construct a WhisperModel, using flash attention on CUDA if possible.
+        
+        Args:
+            model_source: Model name or local model path
+            **options: Keyword arguments for WhisperModel
+        
+        Returns:
+            The loaded WhisperModel
+        """
+        # Imported on first load: faster-whisper pulls in PyAV, tokenizers
+        # and the Hugging Face hub, none of which the window needs to open
+        from faster_whisper import WhisperModel
+        
+        if self.device == "cuda":
+            try:
+                return WhisperModel(model_source, flash_attention=True, **options)
+            except Exception as e:
+                # Needs a recent GPU; older ones run the standard attention
+                print(f"Flash attention unavailable, using standard attention: {e}")
+        return WhisperModel(model_source, **options)
+    
+    def warm_up(self, callback=None):
+        """Run a short silent transcription so the first real one starts hot.
+        
+        Args:
+            callback: Optional callback function called with a boolean
+                indicating if the warm-up succeeded
+        
+        Returns:
+            A boolean indicating if the warm-up started successfully
+        """
+        if not self.is_loaded or self.is_transcribing:
+            return False
+        
+        self.is_transcribing = True
+        
+        def _warm_up():
+            try:
+                start_time = time.time()
+                # Half a second of silence; no VAD so the encoder actually runs
+                segments, _ = self.model.transcribe(
+                    np.zeros(8000, dtype=np.float32),
+                    beam_size=1
+                )
+                list(segments)
+                print(f"Whisper model warmed up in {time.time() - start_time:.2f} seconds")
+                
+                if callback:
+                    callback(True)
+            except Exception as e:
+                print(f"Error warming up Whisper model: {e}")
+                if callback:
+                    callback(False)
+            finally:
+                self.is_transcribing = False
+        
+        self._future = self._submit(_warm_up)
+        
+        return True
     
-    def transcribe(self, audio_file, callback=None):
+    def transcribe(self, audio_file, callback=None, clip_start=None, clip_end=None,
+                   segment_callback=None):
         """Transcribe an audio file to text.
         
         Args:
-            audio_file: Path to the audio file to transcribe
+            audio_file: Path to the audio file to transcribe, or its 16 kHz
+                mono float32 samples as a NumPy array
             callback: Function to call with the transcription result
+            clip_start: Optional offset in seconds where speech starts
+            clip_end: Optional offset in seconds where speech ends
+            segment_callback: Optional function called with the text and end
+                time (seconds) of each segment as soon as it is decoded
         
         Returns:
             A boolean indicating if transcription started successfully
@@ -115,9 +345,15 @@ class Transcriber:
             print("Already transcribing audio.")
             return False
         
-        if not os.path.exists(audio_file):
-            print(f"Audio file not found: {audio_file}")
-            return False
+        # Open the file here rather than checking it exists first, so the
+        # path is only looked up once; the worker decodes from this handle
+        audio = audio_file
+        if isinstance(audio_file, str):
+            try:
+                audio = open(audio_file, "rb")
+            except OSError:
+                print(f"Audio file not found: {audio_file}")
+                return False
         
         self.is_transcribing = True
         self._callback = callback
@@ -125,11 +361,27 @@ class Transcriber:
         def _transcribe():
             try:
                 start_time = time.time()
-                print(f"Starting transcription of {audio_file}")
+                if isinstance(audio_file, str):
+                    print(f"Starting transcription of {audio_file}")
+                else:
+                    print(f"Starting transcription of {len(audio_file) / 16000:.1f}s of audio")
+                
+                # Only decode the detected speech region; Silero VAD is the
+                # fallback when the caller didn't provide one
+                options = {"beam_size": 1}
+                if clip_start is not None and clip_end is not None:
+                    options["clip_timestamps"] = [clip_start, clip_end]
+                else:
+                    options["vad_filter"] = True
                 
-                # Transcribe with Whisper
-                result = self.model.transcribe(audio_file)
-                self._result = result["text"].strip()
+                # Transcribe with Whisper; segments are decoded lazily as we iterate
+                segments, _ = self.model.transcribe(audio, **options)
+                texts = []
+                for segment in segments:
+                    texts.append(segment.text)
+                    if segment_callback:
+                        segment_callback(segment.text, segment.end)
+                self._result = "".join(texts).strip()
                 
                 transcribe_time = time.time() - start_time
                 print(f"Transcription completed in {transcribe_time:.2f} seconds")
@@ -141,11 +393,11 @@ class Transcriber:
                 if self._callback:
                     self._callback(None)
             finally:
+                if audio is not audio_file:
+                    audio.close()
                 self.is_transcribing = False
         
-        self._transcribe_thread = threading.Thread(target=_transcribe)
-        self._transcribe_thread.daemon = True
-        self._transcribe_thread.start()
+        self._future = self._submit(_transcribe)
         
         return True
     
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Text Translation Module
+
+Provides local machine translation with an NLLB-200 model converted for
+CTranslate2, so target-language answers don't need a second LLM call.
+"""
+
+import os
+import threading
+import ctranslate2
+import sentencepiece
+
+# NLLB language tokens for the languages the app supports
+_NLLB_CODES = {
+    "en": "eng_Latn",
+    "ja": "jpn_Jpan",
+    "vi": "vie_Latn",
+}
+
+
+class Translator:
+    """Class for translating text locally with a CTranslate2 NLLB model."""
+    
+    def __init__(self, model_path, device="cpu", compute_type="default", source_language="vi"):
+        """Initialize the translator.
+        
+        The model is loaded on first use, on the thread that translates.
+        
+        Args:
+            model_path: Directory of a CTranslate2-converted NLLB model
+                (e.g. nllb-200-distilled-600M) holding sentencepiece.bpe.model
+            device: Device to run on ("cuda" or "cpu")
+            compute_type: CTranslate2 compute type (e.g. int8)
+            source_language: Language code of the texts to translate
+        """
+        self.model_path = model_path
+        self.device = device
+        self.compute_type = compute_type
+        self.source_language = source_language
+        self._translator = None
+        self._tokenizer = None
+        self._load_lock = threading.Lock()
+    
+    def _ensure_loaded(self):
+        """Load the model and tokenizer if they aren't loaded yet."""
+        with self._load_lock:
+            if self._translator is not None:
+                return
+            self._tokenizer = sentencepiece.SentencePieceProcessor(
+                model_file=os.path.join(self.model_path, "sentencepiece.bpe.model")
+            )
+            self._translator = ctranslate2.Translator(
+                self.model_path,
+                device=self.device,
+                compute_type=self.compute_type
+            )
+    
+    def translate_batch(self, texts, language_codes):
+        """Translate each text into its target language in one call.
+        
+        Args:
+            texts: List of texts in the source language
+            language_codes: Target language code for each text
+        
+        Returns:
+            A list of translated texts
+        """
+        if not texts:
+            return []
+        
+        self._ensure_loaded()
+        
+        source_token = _NLLB_CODES[self.source_language]
+        source = [
+            [source_token] + self._tokenizer.encode(text, out_type=str) + ["</s>"]
+            for text in texts
+        ]
+        target_prefix = [[_NLLB_CODES[code]] for code in language_codes]
+        
+        results = self._translator.translate_batch(
+            source,
+            target_prefix=target_prefix,
+            beam_size=1
+        )
+        
+        # Drop the target language token the output starts with
+        return [
+            self._tokenizer.decode(result.hypotheses[0][1:])
+            for result in results
+        ]
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Unit tests for the AnswerGenerator class.
+"""
+
+import unittest
+import threading
+import concurrent.futures
+from unittest.mock import MagicMock
+
+from answer_generator import AnswerGenerator, _placeholder_answers, _placeholder_translations
+
+
+class TestAnswerGenerator(unittest.TestCase):
+    """Test cases for the AnswerGenerator class."""
+    
+    def setUp(self):
+        """Set up the test environment before each test."""
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.results = {}
+        self.done = threading.Event()
+        self.expected = 0
+    
+    def tearDown(self):
+        """Clean up after each test."""
+        self.executor.shutdown(wait=True)
+    
+    def _callback(self, uid, language_code, vi_answer, lang_answer):
+        self.results[uid] = (language_code, vi_answer, lang_answer)
+        if len(self.results) == self.expected:
+            self.done.set()
+    
+    def test_placeholder_answers(self):
+        """Test the simulated answers for each language."""
+        answers = _placeholder_answers([("q", "en"), ("q", "vi")])
+        translations = _placeholder_translations(answers, ["en", "ja"])
+        
+        self.assertEqual(answers[0], answers[1])
+        self.assertIn("[Simulated]", translations[0])
+        self.assertIn("[シミュレーション]", translations[1])
+    
+    def _hold_first_call(self, answer_batch):
+        """Make a generate_batch mock whose first call blocks until released.
+        
+        Args:
+            answer_batch: Function returning the answers for a batch
+        
+        Returns:
+            A (generate_batch, started, release) tuple
+        """
+        started = threading.Event()
+        release = threading.Event()
+        
+        def generate(batch):
+            if not started.is_set():
+                started.set()
+                release.wait(timeout=2)
+            return answer_batch(batch)
+        
+        return MagicMock(side_effect=generate), started, release
+    
+    def test_first_question_is_not_delayed(self):
+        """Test that a question on an idle worker is answered on its own."""
+        generate_batch = MagicMock(return_value=["vi"])
+        generator = AnswerGenerator(self.executor, generate_batch=generate_batch)
+        self.expected = 1
+        
+        generator.submit("q", "en", callback=self._callback)
+        
+        self.assertTrue(self.done.wait(timeout=2))
+        generate_batch.assert_called_once_with([("q", "en")])
+    
+    def test_queued_questions_are_answered_in_one_batch(self):
+        """Test that questions queued during a call share the next call."""
+        generate_batch, started, release = self._hold_first_call(lambda batch: [
+            f"vi {question}" for question, _ in batch
+        ])
+        translate_batch = MagicMock(side_effect=lambda texts, codes: [
+            f"{code} {text}" for text, code in zip(texts, codes)
+        ])
+        generator = AnswerGenerator(
+            self.executor, generate_batch=generate_batch, translate_batch=translate_batch
+        )
+        self.expected = 4
+        
+        generator.submit("first", "en", callback=self._callback)
+        self.assertTrue(started.wait(timeout=2))
+        uids = [
+            generator.submit(f"q{i}", code, callback=self._callback)
+            for i, code in enumerate(("en", "ja", "vi"))
+        ]
+        release.set()
+        
+        self.assertTrue(self.done.wait(timeout=2))
+        self.assertEqual(generate_batch.call_count, 2)
+        generate_batch.assert_called_with([("q0", "en"), ("q1", "ja"), ("q2", "vi")])
+        # Vietnamese targets skip translation
+        translate_batch.assert_called_with(["vi q0", "vi q1"], ["en", "ja"])
+        self.assertEqual(self.results[uids[1]], ("ja", "vi q1", "ja vi q1"))
+        self.assertEqual(self.results[uids[2]], ("vi", "vi q2", "vi q2"))
+        self.assertEqual(len(set(uids)), 3)
+    
+    def test_batch_size_is_limited(self):
+        """Test that a large backlog is split into several calls."""
+        generate_batch, started, release = self._hold_first_call(
+            lambda batch: ["vi"] * len(batch)
+        )
+        generator = AnswerGenerator(self.executor, generate_batch=generate_batch, max_batch_size=2)
+        self.expected = 6
+        
+        generator.submit("first", "en", callback=self._callback)
+        self.assertTrue(started.wait(timeout=2))
+        for i in range(5):
+            generator.submit(f"q{i}", "en", callback=self._callback)
+        release.set()
+        
+        self.assertTrue(self.done.wait(timeout=2))
+        self.assertEqual(
+            [len(call[0][0]) for call in generate_batch.call_args_list], [1, 2, 2, 1]
+        )
+    
+    def test_answers_are_cached(self):
+        """Test that a repeated question is served from the cache."""
+        generator = AnswerGenerator(self.executor, cache_size=1)
+        self.expected = 1
+        
+        self.assertIsNone(generator.get_cached("Where is Paris?", "en"))
+        generator.submit("Where is Paris?", "en", callback=self._callback)
+        self.assertTrue(self.done.wait(timeout=2))
+        
+        # Case and surrounding whitespace don't matter
+        cached = generator.get_cached("  where is PARIS? ", "en")
+        self.assertEqual(cached, list(self.results.values())[0][1:])
+        self.assertIsNone(generator.get_cached("Where is Paris?", "ja"))
+    
+    def test_cache_evicts_oldest(self):
+        """Test that the cache keeps only the most recent answers."""
+        generator = AnswerGenerator(self.executor, cache_size=1)
+        self.expected = 2
+        
+        generator.submit("first", "en", callback=self._callback)
+        generator.submit("second", "en", callback=self._callback)
+        self.assertTrue(self.done.wait(timeout=2))
+        
+        self.assertIsNone(generator.get_cached("first", "en"))
+        self.assertIsNotNone(generator.get_cached("second", "en"))
+    
+    def test_generation_error(self):
+        """Test that a failed call reports None answers."""
+        generator = AnswerGenerator(
+            self.executor, generate_batch=MagicMock(side_effect=RuntimeError("boom"))
+        )
+        self.expected = 1
+        
+        uid = generator.submit("q", "en", callback=self._callback)
+        
+        self.assertTrue(self.done.wait(timeout=2))
+        self.assertEqual(self.results[uid], ("en", None, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
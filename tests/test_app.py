@@ -6,54 +6,67 @@ Unit tests for the Meeting Question Assistant application.
 """
 
 import unittest
+import importlib
 import tkinter as tk
 from unittest.mock import patch, MagicMock
-import sys
-import os
-import time
-import threading
-
-# Add the src directory to the path so we can import the app module
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
-
-from app import MeetingAssistantApp
-from audio_recorder import AudioRecorder
-from transcriber import Transcriber
 
 
 class TestMeetingAssistantApp(unittest.TestCase):
     """Test cases for the MeetingAssistantApp class."""
     
+    @classmethod
+    def setUpClass(cls):
+        """Create one Tkinter root shared by every test; creating it is the
+        slowest part of the fixture."""
+        # These tests drive real widgets; on a headless runner they are
+        # skipped and the rest of the suite still runs
+        try:
+            cls.root = tk.Tk()
+        except tk.TclError as e:
+            raise unittest.SkipTest(f"Tk is unavailable: {e}")
+        
+        # Imported here rather than at module level, so collecting this file
+        # doesn't load Whisper, OpenAI and the audio backend
+        app_module = importlib.import_module('app')
+        cls.MeetingAssistantApp = app_module.MeetingAssistantApp
+        cls.AppState = app_module.AppState
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Destroy the shared Tkinter root."""
+        cls.root.destroy()
+    
     def setUp(self):
         """Set up the test environment before each test."""
         # Patch the Transcriber and AudioRecorder classes to avoid loading actual model
-        # and interacting with audio hardware during tests
-        self.mock_transcriber_patcher = patch('app.Transcriber')
-        self.mock_audio_recorder_patcher = patch('app.AudioRecorder')
-        
-        # Start the patchers
-        self.mock_transcriber = self.mock_transcriber_patcher.start()
-        self.mock_audio_recorder = self.mock_audio_recorder_patcher.start()
-        
-        # Configure mock instances
+        # and interacting with audio hardware during tests, and the certificate
+        # check, which probes the network on macOS from the bootstrap thread.
+        # One patcher covers all three and addCleanup stops it.
         self.mock_transcriber_instance = MagicMock()
         self.mock_audio_recorder_instance = MagicMock()
+        self.mock_transcriber = MagicMock(return_value=self.mock_transcriber_instance)
+        self.mock_audio_recorder = MagicMock(return_value=self.mock_audio_recorder_instance)
+        patcher = patch.multiple(
+            'app',
+            Transcriber=self.mock_transcriber,
+            AudioRecorder=self.mock_audio_recorder,
+            fix_mac_certificates=MagicMock(return_value=True)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
         
-        self.mock_transcriber.return_value = self.mock_transcriber_instance
-        self.mock_audio_recorder.return_value = self.mock_audio_recorder_instance
-        
-        # Create the app
-        self.root = tk.Tk()
-        self.app = MeetingAssistantApp(self.root)
+        # Create the app on the shared root
+        self.app = self.MeetingAssistantApp(self.root)
     
     def tearDown(self):
         """Clean up after each test."""
-        # Stop the patchers
-        self.mock_transcriber_patcher.stop()
-        self.mock_audio_recorder_patcher.stop()
-        
-        # Destroy the Tkinter root
-        self.root.destroy()
+        # Reset the shared root: drop this app's timers and widgets
+        for after_id in self.root.tk.splitlist(self.root.tk.call('after', 'info')):
+            self.root.after_cancel(after_id)
+        for child in self.root.winfo_children():
+            child.destroy()
+        self.root.attributes("-fullscreen", False)
+        self.app._executor.shutdown(wait=False)
     
     def test_initialization(self):
         """Test that the app initializes correctly."""
@@ -64,14 +77,32 @@ class TestMeetingAssistantApp(unittest.TestCase):
         self.assertTrue(hasattr(self.app, 'record_button'))
         self.assertTrue(hasattr(self.app, 'text_box'))
         self.assertTrue(hasattr(self.app, 'ok_button'))
-        self.assertTrue(hasattr(self.app, 'vi_text'))
-        self.assertTrue(hasattr(self.app, 'lang_text'))
         
         # Verify that new UI components from Task 2 exist
         self.assertTrue(hasattr(self.app, 'status_bar'))
-        self.assertTrue(hasattr(self.app, 'progress_bar'))
+        self.assertTrue(hasattr(self.app, 'processing_label'))
         self.assertTrue(hasattr(self.app, 'fullscreen_button'))
-        self.assertTrue(hasattr(self.app, 'target_lang_frame'))
+        
+        # The answer panel is only built on first use
+        self.assertIsNone(self.app.results_frame)
+    
+    def test_ensure_results_ui(self):
+        """Test that the answer panel is created once, on demand."""
+        self.app._ensure_results_ui()
+        results_frame = self.app.results_frame
+        self.assertIsNotNone(results_frame)
+        self.assertTrue(hasattr(self.app, 'result_text'))
+        
+        # A second call reuses the existing widgets
+        self.app._ensure_results_ui()
+        self.assertIs(self.app.results_frame, results_frame)
+    
+    def test_styles_configured_once_per_root(self):
+        """Test that a second app on the same root skips style configuration."""
+        with patch('app.ttk.Style') as mock_style:
+            self.app._configure_styles()
+        
+        mock_style.assert_not_called()
     
     def test_language_selection(self):
         """Test the language selection functionality."""
@@ -104,21 +135,102 @@ class TestMeetingAssistantApp(unittest.TestCase):
         self.app._end_fullscreen()
         self.assertFalse(self.app.is_fullscreen)
     
+    def test_bootstrap_starts_from_event_loop(self):
+        """Test that the bootstrap thread waits for the Tk event loop."""
+        self.root.after_cancel(self.app._bootstrap_after_id)
+        
+        with patch('app.threading.Thread') as mock_thread:
+            app = self.MeetingAssistantApp(self.root)
+            mock_thread.assert_not_called()
+            
+            self.root.update()
+        
+        mock_thread.assert_called_once()
+        mock_thread.return_value.start.assert_called_once()
+        self.assertIsNone(app._bootstrap_after_id)
+    
+    def test_bootstrap_warns_when_certificates_fail(self):
+        """Test that certificate problems are reported from the UI thread."""
+        with patch('app.fix_mac_certificates', return_value=False), \
+                patch('tkinter.messagebox.showwarning') as mock_showwarning:
+            self.app._bootstrap()
+            mock_showwarning.assert_not_called()
+            
+            self.root.update_idletasks()
+            mock_showwarning.assert_called_once()
+    
     def test_status_bar(self):
         """Test the status bar functionality."""
-        # Check initial status message - during tests it will show initializing
-        initial_status = self.app.status_bar.cget("text")
-        self.assertIn("Initializing", initial_status)
+        # Check initial status message - the model loads on first use
+        initial_status = self.app.status_var.get()
+        self.assertIn("Click Record", initial_status)
         
         # Update status and verify
         test_message = "Test status message"
         self.app._update_status(test_message)
-        self.assertEqual(self.app.status_bar.cget("text"), test_message)
+        self.assertEqual(self.app.status_var.get(), test_message)
+    
+    def test_on_model_loaded_warms_up(self):
+        """Test that recording is enabled only after the warm-up finishes."""
+        self.mock_transcriber_instance.warm_up.return_value = True
+        
+        self.app._on_model_loaded(True)
+        
+        self.assertTrue(self.app.model_loaded)
+        self.assertIn("Warming up", self.app.status_var.get())
+        self.assertTrue(self.app.record_button.instate(["disabled"]))
+        
+        # Finish the warm-up from the worker side and let Tk run the callback
+        callback = self.mock_transcriber_instance.warm_up.call_args[1]['callback']
+        callback(True)
+        self.root.update_idletasks()
+        
+        self.assertIn("Ready", self.app.status_var.get())
+        self.assertFalse(self.app.record_button.instate(["disabled"]))
+    
+    @patch('app.WHISPER_LANGUAGE', None)
+    def test_default_model_ignores_output_language(self):
+        """Test that the answer language doesn't pick the speech model."""
+        self.app.language_var.set("ja")
+        self.app._create_transcriber(None)
+        self.assertIsNone(self.mock_transcriber.call_args[1]['language'])
+    
+    @patch('app.WHISPER_LANGUAGE', "en")
+    def test_default_model_follows_spoken_language(self):
+        """Test that WHISPER_LANGUAGE is passed on to pick the default model."""
+        self.app.language_var.set("vi")
+        self.app._create_transcriber(None)
+        self.assertEqual(self.mock_transcriber.call_args[1]['language'], "en")
+    
+    def test_on_model_selected(self):
+        """Test that picking another model replaces the transcriber."""
+        self.app.model_loaded = True
+        self.mock_transcriber_instance.model_name = "distil-small.en"
+        
+        self.app.model_var.set("tiny")
+        self.app._on_model_selected()
+        
+        self.assertEqual(self.mock_transcriber.call_args[1]['model_name'], "tiny")
+        self.mock_transcriber_instance.close.assert_called_once()
+        self.assertFalse(self.app.model_loaded)
+        self.assertIn("tiny", self.app.status_var.get())
+    
+    def test_on_model_selected_while_busy(self):
+        """Test that the model can't be switched during a recording."""
+        self.mock_transcriber_instance.model_name = "distil-small.en"
+        self.app.state = self.AppState.RECORDING
+        
+        self.app.model_var.set("tiny")
+        self.app._on_model_selected()
+        
+        self.mock_transcriber.assert_called_once()
+        self.assertEqual(self.app.model_var.get(), "distil-small.en")
     
     def test_record_audio_model_not_loaded(self):
         """Test recording audio when the model is not loaded."""
-        # Set up model not loaded state
+        # Set up model still loading state
         self.app.model_loaded = False
+        self.app._model_loading = True
         
         # Mock the messagebox.showinfo function
         with patch('tkinter.messagebox.showinfo') as mock_showinfo:
@@ -129,6 +241,19 @@ class TestMeetingAssistantApp(unittest.TestCase):
             mock_showinfo.assert_called_once()
             self.assertIn("model", mock_showinfo.call_args[0][1].lower())
     
+    def test_record_audio_loads_model_lazily(self):
+        """Test that the first Record click starts loading the model."""
+        # Nothing is loaded at startup
+        self.mock_transcriber_instance.load_model.assert_not_called()
+        self.assertFalse(self.app.record_button.instate(["disabled"]))
+        
+        self.app._record_audio()
+        
+        self.mock_transcriber_instance.load_model.assert_called_once()
+        self.assertEqual(self.app.state, self.AppState.IDLE)
+        self.assertTrue(self.app.record_button.instate(["disabled"]))
+        self.mock_audio_recorder_instance.start_recording.assert_not_called()
+    
     def test_record_audio_start_success(self):
         """Test starting audio recording successfully."""
         # Set up model loaded state
@@ -141,10 +266,22 @@ class TestMeetingAssistantApp(unittest.TestCase):
         self.app._record_audio()
         
         # Verify recording state and UI changes
-        self.assertTrue(self.app.is_recording)
-        self.assertEqual(self.app.record_button.cget("text"), "⏹️ Stop Recording")
+        self.assertEqual(self.app.state, self.AppState.RECORDING)
+        self.assertEqual(self.app.record_text_var.get(), "⏹️ Stop Recording")
         self.mock_audio_recorder_instance.start_recording.assert_called_once()
     
+    def test_record_audio_ignores_clicks_while_busy(self):
+        """Test that clicks while stopping or transcribing change nothing."""
+        self.app.model_loaded = True
+        
+        for state in (self.AppState.STARTING, self.AppState.STOPPING, self.AppState.TRANSCRIBING):
+            self.app.state = state
+            self.app._record_audio()
+            self.assertEqual(self.app.state, state)
+        
+        self.mock_audio_recorder_instance.start_recording.assert_not_called()
+        self.mock_audio_recorder_instance.stop_recording.assert_not_called()
+    
     def test_record_audio_start_failure(self):
         """Test failure to start audio recording."""
         # Set up model loaded state
@@ -163,34 +300,68 @@ class TestMeetingAssistantApp(unittest.TestCase):
             self.assertIn("recording", mock_showerror.call_args[0][1].lower())
         
         # Verify recording state
-        self.assertFalse(self.app.is_recording)
+        self.assertEqual(self.app.state, self.AppState.IDLE)
     
     def test_finish_recording_success(self):
         """Test successfully finishing recording and starting transcription."""
         # Set up recording state
-        self.app.is_recording = True
+        self.app.state = self.AppState.RECORDING
         
         # Configure mocks for successful recording and transcription
         test_audio_file = "/tmp/test_recording.wav"
         self.mock_audio_recorder_instance.stop_recording.return_value = test_audio_file
+        self.mock_audio_recorder_instance.get_speech_bounds.return_value = (0.5, 2.0)
+        self.mock_audio_recorder_instance.get_last_recording_audio.return_value = None
         self.mock_transcriber_instance.transcribe.return_value = True
         
         # Finish recording
         self.app._finish_recording()
         
         # Verify state changes and method calls
-        self.assertFalse(self.app.is_recording)
-        self.assertEqual(self.app.record_button.cget("text"), "🎙️ Listen to question")
+        self.assertEqual(self.app.state, self.AppState.TRANSCRIBING)
+        self.assertEqual(self.app.record_text_var.get(), "🎙️ Listen to question")
         self.mock_audio_recorder_instance.stop_recording.assert_called_once()
-        self.mock_transcriber_instance.transcribe.assert_called_once_with(
-            test_audio_file,
-            callback=self.app._on_transcription_complete
-        )
+        self.mock_transcriber_instance.transcribe.assert_called_once()
+        call_args = self.mock_transcriber_instance.transcribe.call_args
+        self.assertEqual(call_args[0], (test_audio_file,))
+        self.assertEqual(call_args[1]['clip_start'], 0.5)
+        self.assertEqual(call_args[1]['clip_end'], 2.0)
+        
+        # The result is delivered on the Tk thread
+        call_args[1]['callback']("Transcribed text")
+        self.root.update_idletasks()
+        self.assertEqual(self.app.text_box.get(1.0, tk.END).strip(), "Transcribed text")
+        self.assertEqual(self.app.state, self.AppState.IDLE)
+    
+    def test_finish_recording_passes_samples(self):
+        """Test that in-memory samples are transcribed instead of the WAV."""
+        self.app.state = self.AppState.RECORDING
+        samples = MagicMock()
+        self.mock_audio_recorder_instance.sample_rate = 16000
+        self.mock_audio_recorder_instance.stop_recording.return_value = "/tmp/test_recording.wav"
+        self.mock_audio_recorder_instance.get_speech_bounds.return_value = (0.0, 1.0)
+        self.mock_audio_recorder_instance.get_last_recording_audio.return_value = samples
+        
+        self.app._finish_recording()
+        
+        self.assertIs(self.mock_transcriber_instance.transcribe.call_args[0][0], samples)
+    
+    def test_finish_recording_no_speech(self):
+        """Test that silent recordings are not sent to the transcriber."""
+        self.app.state = self.AppState.RECORDING
+        self.mock_audio_recorder_instance.stop_recording.return_value = "/tmp/test_recording.wav"
+        self.mock_audio_recorder_instance.get_speech_bounds.return_value = None
+        
+        self.app._finish_recording()
+        
+        self.mock_transcriber_instance.transcribe.assert_not_called()
+        self.assertIn("No speech", self.app.status_var.get())
+        self.assertFalse(self.app._processing_active)
     
     def test_finish_recording_no_audio_file(self):
         """Test finishing recording when no audio file is produced."""
         # Set up recording state
-        self.app.is_recording = True
+        self.app.state = self.AppState.RECORDING
         
         # Configure mock to return no audio file
         self.mock_audio_recorder_instance.stop_recording.return_value = None
@@ -204,6 +375,65 @@ class TestMeetingAssistantApp(unittest.TestCase):
             mock_showerror.assert_called_once()
             self.assertIn("recording", mock_showerror.call_args[0][1].lower())
     
+    def test_on_ui_thread_defers_callback(self):
+        """Test that wrapped callbacks wait for the Tk event loop."""
+        callback = MagicMock()
+        
+        self.app._on_ui_thread(callback)("result")
+        callback.assert_not_called()
+        
+        self.root.update_idletasks()
+        callback.assert_called_once_with("result")
+    
+    def test_set_text_widget(self):
+        """Test that only the differing tail of a Text widget is rewritten."""
+        widget = self.app.text_box
+        widget.replace(1.0, tk.END, " Hello world ")
+        
+        # Changed tail
+        self.app._set_text_widget(widget, " Hello there")
+        self.assertEqual(widget.get("1.0", "end-1c"), " Hello there")
+        
+        # Pure append
+        with patch.object(widget, 'replace') as mock_replace:
+            self.app._set_text_widget(widget, " Hello there, friend")
+            mock_replace.assert_not_called()
+        self.assertEqual(widget.get("1.0", "end-1c"), " Hello there, friend")
+        
+        # Shorter text
+        self.app._set_text_widget(widget, "Hi")
+        self.assertEqual(widget.get("1.0", "end-1c"), "Hi")
+    
+    def test_on_transcription_segment(self):
+        """Test that streamed segments are appended to the text box in batches."""
+        self.app.text_box.delete(1.0, tk.END)
+        self.app._transcription_span = (1.0, 3.0)
+        
+        self.app._on_transcription_segment("Hello", 2.0)
+        self.app._flush_segments()
+        self.assertEqual(self.app.progress_var.get(), 500)
+        
+        # A burst of segments is drawn in one flush
+        self.app._on_transcription_segment(" world", 2.5)
+        self.app._on_transcription_segment(".", 3.0)
+        self.assertEqual(self.app.text_box.get(1.0, tk.END).strip(), "Hello")
+        self.app._flush_segments()
+        self.assertEqual(self.app.progress_var.get(), 1000)
+        
+        self.assertEqual(self.app.text_box.get(1.0, tk.END).strip(), "Hello world.")
+    
+    def test_segment_flush_scheduled_outside_lock(self):
+        """Test that a burst schedules one flush without holding the segment lock."""
+        def after(delay_ms, callback):
+            self.assertFalse(self.app._segment_lock.locked())
+            return "after#1"
+        
+        with patch.object(self.root, 'after', side_effect=after) as mock_after:
+            self.app._on_transcription_segment("Hello", 1.0)
+            self.app._on_transcription_segment(" world", 2.0)
+        
+        mock_after.assert_called_once_with(50, self.app._flush_segments)
+    
     def test_on_transcription_complete_success(self):
         """Test successful transcription completion."""
         # Test transcription text
@@ -217,7 +447,7 @@ class TestMeetingAssistantApp(unittest.TestCase):
         self.assertEqual(text, test_text)
         
         # Verify status update
-        status_text = self.app.status_bar.cget("text")
+        status_text = self.app.status_var.get()
         self.assertIn("complete", status_text.lower())
     
     def test_on_transcription_complete_error(self):
@@ -233,40 +463,104 @@ class TestMeetingAssistantApp(unittest.TestCase):
             self.assertIn("transcribe", mock_showerror.call_args[0][1].lower())
         
         # Verify status update
-        status_text = self.app.status_bar.cget("text")
+        status_text = self.app.status_var.get()
         self.assertIn("error", status_text.lower())
     
-    @patch('threading.Thread')
-    def test_process_question(self, mock_thread):
-        """Test the question processing with mocked threading."""
+    def test_process_question(self):
+        """Test the question processing queues work on the answer generator."""
         # Set up a test question
         test_question = "What is the capital of France?"
         self.app.text_box.delete(1.0, tk.END)
         self.app.text_box.insert(tk.END, test_question)
         
-        # Process the question
-        self.app._process_question()
+        # Process the question with the generator mocked
+        with patch.object(self.app._answer_generator, 'submit', return_value=7) as mock_submit, \
+                patch('threading.Thread') as mock_thread:
+            self.app._process_question()
         
-        # Verify thread was started
-        mock_thread.assert_called_once()
-        mock_thread.return_value.start.assert_called_once()
+        # Verify the question is queued rather than run on a new thread
+        mock_thread.assert_not_called()
+        mock_submit.assert_called_once_with(
+            test_question, "en", callback=self.app._on_answer_ready
+        )
+        self.assertEqual(self.app._current_question_uid, 7)
         
         # Verify status bar message contains the selected language
-        status_text = self.app.status_bar.cget("text")
+        status_text = self.app.status_var.get()
         self.assertIn("Processing question in English", status_text)
     
+    def test_process_question_uses_cached_answer(self):
+        """Test that a cached answer is shown without queuing the question."""
+        self.app.text_box.delete(1.0, tk.END)
+        self.app.text_box.insert(tk.END, "What is the capital of France?")
+        
+        with patch.object(self.app._answer_generator, 'get_cached', return_value=("vi", "en")), \
+                patch.object(self.app._answer_generator, 'submit') as mock_submit, \
+                patch.object(self.app, '_update_results') as mock_update:
+            self.app._process_question()
+        
+        mock_submit.assert_not_called()
+        mock_update.assert_called_once_with("vi", "en", "English")
+        self.assertFalse(self.app._processing_active)
+    
+    def test_on_answer_ready_ignores_superseded_question(self):
+        """Test that only the answer to the latest question is posted."""
+        self.app._current_question_uid = 2
+        
+        with patch.object(self.app, '_post_results') as mock_post:
+            self.app._on_answer_ready(1, "en", "old vi", "old en")
+            self.app._on_answer_ready(2, "ja", "new vi", "new ja")
+        
+        mock_post.assert_called_once_with("new vi", "new ja", "Japanese")
+    
+    def test_on_close(self):
+        """Test closing the window shuts down the workers and microphone."""
+        with patch.object(self.app._executor, 'shutdown') as mock_shutdown, \
+                patch.object(self.root, 'destroy') as mock_destroy:
+            self.app._on_close()
+        
+        mock_shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+        self.mock_audio_recorder_instance.close.assert_called_once()
+        self.mock_transcriber_instance.close.assert_called_once()
+        mock_destroy.assert_called_once()
+    
+    def test_on_close_cancels_pending_timers(self):
+        """Test closing the window cancels scheduled Tk callbacks."""
+        self.app._show_warning("Test warning")
+        warning_after_id = self.app._warning_after_id
+        bootstrap_after_id = self.app._bootstrap_after_id
+        
+        with patch.object(self.root, 'after_cancel') as mock_after_cancel, \
+                patch.object(self.root, 'destroy'):
+            self.app._on_close()
+        
+        self.assertEqual(
+            [call[0][0] for call in mock_after_cancel.call_args_list],
+            [bootstrap_after_id, warning_after_id]
+        )
+    
     def test_empty_question_warning(self):
-        """Test that an empty question shows a warning."""
+        """Test that an empty question shows an inline warning."""
         # Clear the text box
         self.app.text_box.delete(1.0, tk.END)
         
-        # Use a mock for messagebox.showwarning
+        # No modal dialog should be opened
         with patch('tkinter.messagebox.showwarning') as mock_warning:
             self.app._process_question()
-            mock_warning.assert_called_once_with(
-                "Empty Question", 
-                "Please provide a question to process."
-            )
+            mock_warning.assert_not_called()
+        
+        # The inline warning is shown with the validation message, and the
+        # answer panel isn't built for nothing
+        self.assertIsNone(self.app.results_frame)
+        self.assertEqual(self.app.warning_label.winfo_manager(), "grid")
+        self.assertEqual(
+            self.app.warning_label.cget("text"),
+            "Please provide a question to process."
+        )
+        
+        # And hides itself again
+        self.app._hide_warning()
+        self.assertEqual(self.app.warning_label.winfo_manager(), "")
     
     def test_update_results(self):
         """Test the update_results method."""
@@ -275,28 +569,33 @@ class TestMeetingAssistantApp(unittest.TestCase):
         lang_answer = "This is a test answer."
         
         # Update results
-        self.app._update_results(vi_answer, lang_answer)
+        self.app._ensure_results_ui()
+        self.app._update_results(vi_answer, lang_answer, "English")
+        
+        # Verify the results are displayed correctly in their tagged regions
+        result_text = self.app.result_text
+        self.assertEqual(result_text.get(*result_text.tag_ranges("vi")), vi_answer)
+        self.assertEqual(result_text.get(*result_text.tag_ranges("lang")), lang_answer)
+        self.assertIn("English", result_text.get(1.0, tk.END))
         
-        # Verify the results are displayed correctly
-        self.assertEqual(self.app.vi_text.get(1.0, tk.END).strip(), vi_answer)
-        self.assertEqual(self.app.lang_text.get(1.0, tk.END).strip(), lang_answer)
+        # The answer pane stays read-only
+        self.assertEqual(str(result_text.cget("state")), "disabled")
         
         # Verify status message
         self.assertEqual(
-            self.app.status_bar.cget("text"),
+            self.app.status_var.get(),
             "Processing complete. Answer is displayed below."
         )
     
     def test_show_processing_indicator(self):
         """Test the processing indicator functionality."""
-        # Initial state - progress bar should be hidden
-        self.assertFalse(self.app.progress_bar.winfo_ismapped())
+        # Initial state - processing label should be hidden
+        self.assertFalse(self.app.processing_label.winfo_ismapped())
         
-        # Show processing
+        # Show processing; the grid manager is queried directly, so no
+        # event-loop round trip is needed
         self.app._show_processing(True)
-        
-        # Force update of the UI
-        self.root.update()
+        self.assertTrue(self.app.processing_frame.grid_info())
         
         # Verify buttons are disabled
         self.assertEqual(self.app.ok_button.state(), ('disabled',))
@@ -305,62 +604,49 @@ class TestMeetingAssistantApp(unittest.TestCase):
         # Hide processing
         self.app._show_processing(False)
         
-        # Verify progress bar is hidden and buttons enabled
-        self.assertFalse(self.app.progress_bar.winfo_ismapped())
+        # Verify processing label is hidden and buttons enabled
+        self.assertFalse(self.app.processing_label.winfo_ismapped())
         self.assertEqual(self.app.ok_button.state(), ())
         self.assertEqual(self.app.record_button.state(), ())
     
-    def test_simulate_processing(self):
-        """Test the simulated processing functionality."""
-        # Create test data
-        test_question = "What is the capital of France?"
-        language_code = "en"
-        
-        # Expected results
-        expected_vi = "[Giả lập] Thủ đô của Pháp là Paris. Đây là một thành phố lịch sử và văn hóa."
-        expected_en = "[Simulated] The capital of France is Paris. It is a historical and cultural city."
+    def test_show_processing_skips_redundant_toggle(self):
+        """Test that hiding an already hidden indicator makes no widget calls."""
+        with patch.object(self.app.ok_button, 'state') as mock_state, \
+                patch.object(self.app.processing_frame, 'grid_remove') as mock_remove:
+            self.app._show_processing(False)
+        
+        mock_state.assert_not_called()
+        mock_remove.assert_not_called()
+    
+    def test_update_results_error(self):
+        """Test that a failed generation restores the UI and reports it."""
+        self.app._ensure_results_ui()
+        self.app._show_processing(True)
         
-        # Modify the _simulate_processing method to directly call _update_results for testing
-        # instead of using root.after which doesn't work in test environment
-        original_method = self.app._simulate_processing
+        self.app._update_results(None, None, "English")
         
-        def mock_simulate_processing(question, language_code):
-            # Simulate processing delay
-            # time.sleep(2)  # Skip in test
+        self.assertFalse(self.app._processing_active)
+        self.assertIn("Error", self.app.status_var.get())
+    
+    def test_post_results_coalesces_updates(self):
+        """Test that several posts before a flush produce one UI update."""
+        with patch.object(self.root, 'after_idle') as mock_after_idle, \
+                patch.object(self.app, '_update_results') as mock_update:
+            self.app._post_results("vi 1", "lang 1", "English")
+            self.app._post_results("vi 2", "lang 2", "Japanese")
             
-            # Generate placeholder results
-            vi_answer = expected_vi
+            # Only one flush is scheduled for the burst
+            mock_after_idle.assert_called_once_with(self.app._flush_pending)
             
-            # Different answers based on language
-            if language_code == "en":
-                lang_answer = expected_en
-            elif language_code == "ja":
-                lang_answer = f"[シミュレーション] フランスの首都はパリです。それは歴史的で文化的な都市です。"
-            else:  # Vietnamese
-                lang_answer = vi_answer
+            # The flush displays the latest results only
+            self.app._flush_pending()
+            mock_update.assert_called_once_with(
+                vi_answer="vi 2", lang_answer="lang 2", language_name="Japanese"
+            )
             
-            # Directly call update_results instead of scheduling it
-            self.app._update_results(vi_answer, lang_answer)
-        
-        # Replace the method temporarily
-        self.app._simulate_processing = mock_simulate_processing
-        
-        try:
-            # Mock update_results to verify it's called with correct parameters
-            with patch.object(self.app, '_update_results', wraps=self.app._update_results) as wrapped_update:
-                # Call the processing method
-                self.app._simulate_processing(test_question, language_code)
-                
-                # Verify update_results was called with correct parameters
-                wrapped_update.assert_called_once()
-                args = wrapped_update.call_args[0]
-                
-                # Verify the content of the answers
-                self.assertEqual(args[0], expected_vi)
-                self.assertEqual(args[1], expected_en)
-        finally:
-            # Restore original method
-            self.app._simulate_processing = original_method
+            # Nothing left to display on a second flush
+            self.app._flush_pending()
+            mock_update.assert_called_once()
 
 
 if __name__ == '__main__':
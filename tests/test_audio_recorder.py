@@ -8,12 +8,9 @@ Unit tests for the AudioRecorder class.
 import unittest
 import os
 import tempfile
-from unittest.mock import patch, MagicMock
+import wave
+from unittest.mock import patch
 import numpy as np
-import sys
-
-# Add the src directory to the path so we can import the modules
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
 
 from audio_recorder import AudioRecorder
 
@@ -24,17 +21,19 @@ class TestAudioRecorder(unittest.TestCase):
     def setUp(self):
         """Set up the test environment before each test."""
         self.recorder = AudioRecorder(sample_rate=16000, channels=1)
+        self.recorder.temp_dir = tempfile.mkdtemp()
     
     def test_initialization(self):
         """Test that the AudioRecorder initializes correctly."""
         self.assertEqual(self.recorder.sample_rate, 16000)
         self.assertEqual(self.recorder.channels, 1)
         self.assertFalse(self.recorder.recording)
-        self.assertEqual(self.recorder.frames, [])
+        self.assertIsNone(self.recorder._buf)
         self.assertIsNone(self.recorder.audio_filename)
     
+    @patch('audio_recorder.sd.InputStream')
     @patch('threading.Thread')
-    def test_start_recording(self, mock_thread):
+    def test_start_recording(self, mock_thread, mock_stream):
         """Test starting audio recording."""
         # Mock the thread to avoid actual recording
         mock_thread.return_value.daemon = None
@@ -47,6 +46,64 @@ class TestAudioRecorder(unittest.TestCase):
         self.assertTrue(self.recorder.recording)
         mock_thread.assert_called_once()
         mock_thread.return_value.start.assert_called_once()
+        mock_stream.return_value.start.assert_called_once()
+        self.assertEqual(mock_stream.call_args[1]['dtype'], 'int16')
+        self.assertEqual(mock_stream.call_args[1]['blocksize'], 800)
+    
+    @patch('audio_recorder.sd.InputStream')
+    @patch('threading.Thread')
+    def test_stream_is_reused_between_recordings(self, mock_thread, mock_stream):
+        """Test that the input stream is opened once and kept open."""
+        self.recorder.start_recording()
+        self.recorder.stop_recording()
+        self.recorder.start_recording()
+        
+        mock_stream.assert_called_once()
+        mock_stream.return_value.close.assert_not_called()
+    
+    @patch('audio_recorder.sd.InputStream')
+    @patch('threading.Thread')
+    def test_buffer_is_reused_between_recordings(self, mock_thread, mock_stream):
+        """Test that recordings of the same length share one buffer."""
+        self.recorder.start_recording(max_duration=5)
+        buf = self.recorder._buf
+        self.recorder.stop_recording()
+        
+        self.recorder.start_recording(max_duration=5)
+        self.assertIs(self.recorder._buf, buf)
+        self.recorder.stop_recording()
+        
+        self.recorder.start_recording(max_duration=10)
+        self.assertEqual(len(self.recorder._buf), 160000)
+    
+    @patch('audio_recorder.sd.InputStream', side_effect=Exception("no device"))
+    def test_start_recording_stream_error(self, mock_stream):
+        """Test that a missing microphone fails the start cleanly."""
+        self.assertFalse(self.recorder.start_recording())
+        self.assertFalse(self.recorder.recording)
+    
+    @patch('audio_recorder.sd.InputStream')
+    @patch('threading.Thread')
+    def test_context_manager_closes_stream(self, mock_thread, mock_stream):
+        """Test that leaving the context releases the microphone."""
+        with AudioRecorder() as recorder:
+            recorder.start_recording()
+        
+        self.assertFalse(recorder.recording)
+        mock_stream.return_value.close.assert_called_once()
+        self.assertIsNone(recorder._stream)
+    
+    @patch('audio_recorder.sd.InputStream')
+    def test_stop_wakes_recording_thread(self, mock_stream):
+        """Test that stopping doesn't wait out the timer thread's tick."""
+        self.recorder.start_recording(max_duration=60)
+        thread = self.recorder._recording_thread
+        
+        with patch.object(self.recorder._stop_event, 'set', wraps=self.recorder._stop_event.set) as mock_set:
+            self.recorder.stop_recording()
+        
+        mock_set.assert_called_once()
+        self.assertFalse(thread.is_alive())
     
     def test_start_recording_already_recording(self):
         """Test starting recording when already recording."""
@@ -73,37 +130,174 @@ class TestAudioRecorder(unittest.TestCase):
         self.assertFalse(self.recorder.recording)
         self.assertIsNone(result)  # No audio file since no frames
     
-    @patch('wave.open')
-    @patch('numpy.concatenate')
+    @patch('audio_recorder.sd.InputStream')
     @patch('threading.Thread')
-    def test_stop_recording_with_frames(self, mock_thread, mock_concatenate, mock_wave_open):
+    def test_stop_recording_with_frames(self, mock_thread, mock_stream):
         """Test stopping recording with frames."""
-        # Set up recording state
-        self.recorder.recording = True
-        mock_thread.return_value.is_alive.return_value = True
-        
-        # Create a mock frame
-        mock_frame = np.zeros((1600, 1))
-        self.recorder.frames = [mock_frame]
-        
-        # Mock numpy concatenate
-        mock_data = np.zeros((1600, 1))
-        mock_concatenate.return_value = mock_data
-        
-        # Set up wave mock
-        mock_wf = MagicMock()
-        mock_wave_open.return_value.__enter__.return_value = mock_wf
+        self.recorder.start_recording()
+        self.recorder._on_audio(np.full((1600, 1), 100, dtype=np.int16), 1600, None, None)
         
         # Stop recording
-        with patch('time.time', return_value=12345):
-            result = self.recorder.stop_recording()
+        result = self.recorder.stop_recording()
         
         # Check results
         self.assertFalse(self.recorder.recording)
         self.assertIsNotNone(result)  # Should have an audio file path
         self.assertTrue(result.endswith('.wav'))  # Should be a WAV file
-        mock_wf.setnchannels.assert_called_once_with(1)
-        mock_wf.setframerate.assert_called_once_with(16000)
+        with wave.open(result, 'rb') as wf:
+            self.assertEqual(wf.getnchannels(), 1)
+            self.assertEqual(wf.getframerate(), 16000)
+            self.assertEqual(wf.getnframes(), 1600)
+    
+    @patch('audio_recorder.sd.InputStream')
+    @patch('threading.Thread')
+    def test_wav_is_written_while_recording(self, mock_thread, mock_stream):
+        """Test that recorded blocks reach the WAV before the recording stops."""
+        self.recorder.start_recording()
+        self.recorder._on_audio(np.ones((800, 1), dtype=np.int16), 800, None, None)
+        
+        self.recorder._flush_wav()
+        self.assertEqual(self.recorder._flushed_idx, 800)
+        
+        self.recorder._on_audio(np.ones((800, 1), dtype=np.int16), 800, None, None)
+        path = self.recorder.stop_recording()
+        with wave.open(path, 'rb') as wf:
+            self.assertEqual(wf.getnframes(), 1600)
+    
+    @patch('audio_recorder.sd.InputStream')
+    @patch('threading.Thread')
+    def test_recordings_get_distinct_files(self, mock_thread, mock_stream):
+        """Test that back-to-back recordings don't overwrite each other."""
+        paths = []
+        for _ in range(2):
+            self.recorder.start_recording()
+            self.recorder._on_audio(np.ones((800, 1), dtype=np.int16), 800, None, None)
+            paths.append(self.recorder.stop_recording())
+        
+        self.assertNotEqual(paths[0], paths[1])
+    
+    @patch('audio_recorder.sd.InputStream')
+    @patch('threading.Thread')
+    def test_previous_recording_is_removed(self, mock_thread, mock_stream):
+        """Test that starting a recording deletes the last one's file."""
+        self.recorder.start_recording()
+        self.recorder._on_audio(np.ones((800, 1), dtype=np.int16), 800, None, None)
+        first = self.recorder.stop_recording()
+        
+        self.recorder.start_recording()
+        
+        self.assertFalse(os.path.exists(first))
+        self.assertIsNone(self.recorder.get_last_recording_path())
+    
+    @patch('audio_recorder.sd.InputStream')
+    @patch('threading.Thread')
+    def test_close_removes_last_recording(self, mock_thread, mock_stream):
+        """Test that closing the recorder deletes the last recording's file."""
+        self.recorder.start_recording()
+        self.recorder._on_audio(np.ones((800, 1), dtype=np.int16), 800, None, None)
+        path = self.recorder.stop_recording()
+        
+        self.recorder.close()
+        
+        self.assertFalse(os.path.exists(path))
+    
+    @patch('audio_recorder.sd.InputStream')
+    @patch('threading.Thread')
+    def test_stop_after_max_duration(self, mock_thread, mock_stream):
+        """Test that a recording stopped by its time limit is still saved."""
+        self.recorder.start_recording()
+        self.recorder._on_audio(np.ones((800, 1), dtype=np.int16), 800, None, None)
+        self.recorder.recording = False  # What _record_audio does on timeout
+        
+        self.assertIsNotNone(self.recorder.stop_recording())
+    
+    def test_on_audio_fills_buffer(self):
+        """Test that stream blocks are copied into the buffer in place."""
+        self.recorder.recording = True
+        self.recorder._buf = np.zeros((4, 1), dtype=np.int16)
+        
+        self.recorder._on_audio(np.full((3, 1), 16383, dtype=np.int16), 3, None, None)
+        self.assertEqual(self.recorder._write_idx, 3)
+        self.assertEqual(self.recorder._buf[0, 0], 16383)
+        
+        # Blocks beyond max_duration are dropped
+        self.recorder._on_audio(np.full((3, 1), 32767, dtype=np.int16), 3, None, None)
+        self.assertEqual(self.recorder._write_idx, 4)
+        self.assertEqual(self.recorder._buf[3, 0], 32767)
+    
+    @patch('builtins.print')
+    def test_on_audio_defers_status_reporting(self, mock_print):
+        """Test that stream status flags are counted, not printed, on the audio thread."""
+        self.recorder.recording = True
+        self.recorder._buf = np.zeros((4, 1), dtype=np.int16)
+        
+        self.recorder._on_audio(np.ones((2, 1), dtype=np.int16), 2, None, "input overflow")
+        
+        mock_print.assert_not_called()
+        self.assertEqual(self.recorder._status_count, 1)
+    
+    def test_on_audio_ignored_when_not_recording(self):
+        """Test that the persistent stream drops audio between recordings."""
+        self.recorder._buf = np.zeros((4, 1), dtype=np.int16)
+        
+        self.recorder._on_audio(np.ones((2, 1), dtype=np.int16), 2, None, None)
+        
+        self.assertEqual(self.recorder._write_idx, 0)
+    
+    @patch('audio_recorder.sd.InputStream')
+    @patch('threading.Thread')
+    def test_speech_bounds(self, mock_thread, mock_stream):
+        """Test that speech bounds are found around the loud region, padded."""
+        block = np.zeros((16000, 1), dtype=np.int16)
+        block[8000:12000] = 16384
+        self.recorder.start_recording()
+        self.recorder._on_audio(block, 16000, None, None)
+        
+        self.recorder.stop_recording()
+        
+        start, end = self.recorder.get_speech_bounds()
+        self.assertAlmostEqual(start, 0.3)
+        self.assertAlmostEqual(end, 0.95)
+    
+    @patch('audio_recorder.sd.InputStream')
+    @patch('threading.Thread')
+    def test_speech_is_detected_while_recording(self, mock_thread, mock_stream):
+        """Test that a scan split across timer ticks finds the same bounds."""
+        block = np.zeros((16000, 1), dtype=np.int16)
+        block[8000:12000] = 16384
+        self.recorder.start_recording()
+        self.recorder._on_audio(block[:9000], 9000, None, None)
+        self.recorder._analyze()
+        self.recorder._on_audio(block[9000:], 7000, None, None)
+        
+        self.recorder.stop_recording()
+        
+        # Same bounds as scanning the whole recording at once
+        np.testing.assert_allclose(self.recorder.get_speech_bounds(), (0.3, 0.95))
+        self.assertEqual(len(self.recorder.get_last_recording_audio()), 16000)
+    
+    @patch('audio_recorder.sd.InputStream')
+    @patch('threading.Thread')
+    def test_silence_has_no_speech_bounds(self, mock_thread, mock_stream):
+        """Test that a silent recording yields no speech bounds."""
+        self.recorder.start_recording()
+        self.recorder._on_audio(np.zeros((16000, 1), dtype=np.int16), 16000, None, None)
+        
+        self.assertIsNotNone(self.recorder.stop_recording())
+        self.assertIsNone(self.recorder.get_speech_bounds())
+    
+    def test_save_audio_keeps_mono_samples(self):
+        """Test that the saved recording is also kept as mono float32 samples."""
+        self.recorder.channels = 2
+        with patch('audio_recorder.sd.InputStream'), patch('threading.Thread'):
+            self.recorder.start_recording()
+        self.recorder._on_audio(np.full((1600, 2), 8192, dtype=np.int16), 1600, None, None)
+        
+        self.assertIsNotNone(self.recorder.stop_recording())
+        
+        audio = self.recorder.get_last_recording_audio()
+        self.assertEqual(audio.shape, (1600,))
+        self.assertEqual(audio.dtype, np.float32)
     
     def test_get_last_recording_path(self):
         """Test getting the path to the last recording."""
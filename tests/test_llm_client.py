@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Unit tests for the LLMClient class.
+"""
+
+import unittest
+import asyncio
+import concurrent.futures
+import threading
+from unittest.mock import patch, MagicMock, AsyncMock
+
+from llm_client import LLMClient
+
+
+def _response(text):
+    """Build a chat completion response carrying ``text``."""
+    return MagicMock(choices=[MagicMock(message=MagicMock(content=text))])
+
+
+class TestLLMClient(unittest.TestCase):
+    """Test cases for the LLMClient class."""
+    
+    def setUp(self):
+        """Set up the test environment before each test."""
+        self.openai_patcher = patch('llm_client.AsyncOpenAI')
+        self.mock_openai = self.openai_patcher.start()
+        self.mock_openai.return_value.close = AsyncMock()
+        self.create = AsyncMock(side_effect=lambda model, messages: _response(
+            f" answer to {messages[-1]['content']} "
+        ))
+        self.mock_openai.return_value.chat.completions.create = self.create
+        self.client = LLMClient("test-key", model="test-model")
+    
+    def tearDown(self):
+        """Clean up after each test."""
+        self.client.close()
+        self.openai_patcher.stop()
+    
+    def test_initialization(self):
+        """Test that one API client is shared for the client lifetime."""
+        self.mock_openai.assert_called_once_with(api_key="test-key")
+        self.assertTrue(self.client._thread.is_alive())
+    
+    def test_generate_batch(self):
+        """Test that every question of a batch is answered in order."""
+        answers = self.client.generate_batch([("q1", "en"), ("q2", "ja")])
+        
+        self.assertEqual(answers, ["answer to q1", "answer to q2"])
+        self.assertEqual(self.create.await_count, 2)
+        self.assertEqual(self.create.call_args[1]['model'], "test-model")
+    
+    def _slow_create(self):
+        """Make chat completion calls hang until cancelled.
+        
+        Returns:
+            A (started, cancelled) pair of events
+        """
+        started = threading.Event()
+        cancelled = threading.Event()
+        
+        async def create(model, messages):
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+        
+        self.create.side_effect = create
+        return started, cancelled
+    
+    def test_empty_content(self):
+        """Test that a reply without text gives an empty answer."""
+        self.create.side_effect = None
+        self.create.return_value = _response(None)
+        
+        self.assertEqual(self.client.generate_batch([("q", "en")]), [""])
+    
+    def test_generate_batch_timeout_cancels_requests(self):
+        """Test that a timed-out batch stops its requests."""
+        _, cancelled = self._slow_create()
+        self.client.timeout = 0.1
+        
+        with self.assertRaises(concurrent.futures.TimeoutError):
+            self.client.generate_batch([("q", "en")])
+        
+        self.assertTrue(cancelled.wait(timeout=2))
+        self.assertFalse(self.client._futures)
+    
+    def test_close_cancels_pending_batch(self):
+        """Test that closing unblocks a worker waiting for answers."""
+        started, cancelled = self._slow_create()
+        errors = []
+        
+        def worker():
+            try:
+                self.client.generate_batch([("q", "en")])
+            except Exception as e:
+                errors.append(e)
+        
+        thread = threading.Thread(target=worker)
+        thread.start()
+        self.assertTrue(started.wait(timeout=2))
+        
+        self.client.close()
+        thread.join(timeout=2)
+        
+        self.assertFalse(thread.is_alive())
+        self.assertIsInstance(errors[0], concurrent.futures.CancelledError)
+        self.assertTrue(cancelled.wait(timeout=2))
+    
+    def test_close(self):
+        """Test that closing stops the loop thread and the HTTP client."""
+        self.client.close()
+        
+        self.assertFalse(self.client._thread.is_alive())
+        self.mock_openai.return_value.close.assert_awaited_once()
+        
+        # Closing twice is harmless
+        self.client.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
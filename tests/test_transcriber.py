@@ -8,13 +8,13 @@ Unit tests for the Transcriber class.
 import unittest
 import os
 import tempfile
-from unittest.mock import patch, MagicMock
-import sys
+import shutil
+import threading
+from unittest.mock import patch, MagicMock, ANY
+import numpy as np
 
-# Add the src directory to the path so we can import the modules
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
-
-from transcriber import Transcriber
+import transcriber as transcriber_module
+from transcriber import Transcriber, _default_compute_type, _default_device, _default_model
 
 
 class TestTranscriber(unittest.TestCase):
@@ -22,50 +22,251 @@ class TestTranscriber(unittest.TestCase):
     
     def setUp(self):
         """Set up the test environment before each test."""
-        with patch('whisper.load_model'):
-            import os
-            whisper_model = os.getenv("WHISPER_MODEL", "medium")
-            self.transcriber = Transcriber(model_name=whisper_model)
+        transcriber_module._MODEL_CACHE.clear()
+        
+        # Keep downloaded-model markers out of the real cache directory
+        self.cache_dir = tempfile.mkdtemp()
+        self.env_patcher = patch.dict(os.environ, {"WHISPER_CACHE_DIR": self.cache_dir})
+        self.env_patcher.start()
+        
+        # An audio file the transcribe tests can open
+        self.audio_path = os.path.join(self.cache_dir, "test.wav")
+        open(self.audio_path, "wb").close()
+        
+        # The constructor doesn't touch WhisperModel; models load lazily
+        whisper_model = os.getenv("WHISPER_MODEL", "medium")
+        self.transcriber = Transcriber(model_name=whisper_model)
+    
+    def tearDown(self):
+        """Clean up after each test."""
+        self.env_patcher.stop()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
     
     def test_initialization(self):
         """Test that the Transcriber initializes correctly."""
-        import os
         whisper_model = os.getenv("WHISPER_MODEL", "medium")
         self.assertEqual(self.transcriber.model_name, whisper_model)
         self.assertFalse(self.transcriber.is_loaded)
         self.assertFalse(self.transcriber.is_transcribing)
         self.assertIsNone(self.transcriber.model)
         self.assertIsNone(self.transcriber._result)
+        self.assertEqual(self.transcriber.download_root, self.cache_dir)
     
-    @patch('threading.Thread')
-    @patch('whisper.load_model')
-    def test_load_model(self, mock_load_model, mock_thread):
-        """Test loading the Whisper model."""
-        # Mock the thread to avoid actually loading the model
-        mock_thread.return_value.daemon = None
+    def test_compute_type_from_argument(self):
+        """Test that an explicit compute type is kept."""
+        with patch('faster_whisper.WhisperModel'):
+            transcriber = Transcriber(model_name="tiny", compute_type="float32")
+        self.assertEqual(transcriber.compute_type, "float32")
+    
+    @patch.dict(os.environ, {"WHISPER_COMPUTE_TYPE": "int8_float32"})
+    def test_compute_type_from_environment(self):
+        """Test that WHISPER_COMPUTE_TYPE overrides auto-detection."""
+        transcriber = Transcriber(model_name="tiny")
+        self.assertEqual(transcriber.compute_type, "int8_float32")
+    
+    @patch('ctranslate2.get_supported_compute_types', return_value={"float32", "int8", "int8_float32"})
+    def test_default_compute_type_cpu_int8(self, mock_supported):
+        """Test that int8 is chosen on CPUs that support it."""
+        self.assertEqual(_default_compute_type("cpu"), "int8")
+        mock_supported.assert_called_once_with("cpu")
+    
+    @patch('ctranslate2.get_supported_compute_types', return_value={"float32"})
+    def test_default_compute_type_fallback(self, mock_supported):
+        """Test the float32 fallback when no quantized type is available."""
+        self.assertEqual(_default_compute_type("cpu"), "float32")
+    
+    @patch('ctranslate2.get_supported_compute_types', return_value={"float32", "bfloat16"})
+    def test_default_compute_type_cpu_bfloat16(self, mock_supported):
+        """Test that bfloat16 is preferred over float32 without int8 kernels."""
+        self.assertEqual(_default_compute_type("cpu"), "bfloat16")
+    
+    @patch('ctranslate2.get_supported_compute_types', return_value={"float32", "float16", "int8_float16"})
+    def test_default_compute_type_cuda(self, mock_supported):
+        """Test that int8_float16 is chosen on CUDA."""
+        self.assertEqual(_default_compute_type("cuda"), "int8_float16")
+        mock_supported.assert_called_once_with("cuda")
+    
+    def test_default_model(self):
+        """Test the language and device aware default model."""
+        self.assertEqual(_default_model("en", "cpu"), "distil-small.en")
+        self.assertEqual(_default_model("ja", "cuda"), "large-v3-turbo")
+        self.assertEqual(_default_model("vi", "cpu"), "small")
+    
+    @patch.dict(os.environ, {}, clear=True)
+    def test_model_defaults_to_multilingual(self):
+        """Test that the default model handles any language when it's unknown."""
+        transcriber = Transcriber(compute_type="int8", device="cpu")
+        self.assertEqual(transcriber.model_name, "small")
+    
+    @patch.dict(os.environ, {}, clear=True)
+    def test_model_defaults_to_language(self):
+        """Test that an English-only model is picked for English."""
+        transcriber = Transcriber(compute_type="int8", device="cpu", language="en")
+        self.assertEqual(transcriber.model_name, "distil-small.en")
+    
+    @patch('ctranslate2.get_cuda_device_count', return_value=1)
+    def test_default_device_cuda(self, mock_cuda_count):
+        """Test that CUDA is selected when a GPU is available."""
+        self.assertEqual(_default_device(), "cuda")
+    
+    @patch('ctranslate2.get_cuda_device_count', return_value=0)
+    def test_default_device_cpu(self, mock_cuda_count):
+        """Test the CPU fallback without a GPU."""
+        self.assertEqual(_default_device(), "cpu")
+    
+    @patch.object(Transcriber, '_submit')
+    @patch('faster_whisper.WhisperModel')
+    def test_load_model_uses_device(self, mock_whisper_model, mock_submit):
+        """Test that the model is created on the configured device."""
+        transcriber = Transcriber(
+            model_name="tiny", compute_type="float16", device="cuda", device_index=1
+        )
+        transcriber.load_model()
+        
+        # Run the loader synchronously
+        mock_submit.call_args[0][0]()
+        
+        mock_whisper_model.assert_called_once_with(
+            "tiny", device="cuda", device_index=1, compute_type="float16",
+            download_root=self.cache_dir, flash_attention=True
+        )
+        self.assertTrue(transcriber.is_loaded)
+    
+    @patch('faster_whisper.WhisperModel')
+    def test_flash_attention_fallback(self, mock_whisper_model):
+        """Test that GPUs without flash attention use the standard kernels."""
+        transcriber = Transcriber(model_name="tiny", compute_type="float16", device="cuda")
+        mock_whisper_model.side_effect = [ValueError("unsupported"), MagicMock()]
+        
+        transcriber._new_whisper_model("tiny")
+        
+        self.assertEqual(mock_whisper_model.call_count, 2)
+        self.assertNotIn("flash_attention", mock_whisper_model.call_args[1])
+    
+    @patch('faster_whisper.WhisperModel')
+    def test_no_flash_attention_on_cpu(self, mock_whisper_model):
+        """Test that flash attention is only requested on CUDA."""
+        transcriber = Transcriber(model_name="tiny", compute_type="int8", device="cpu")
+        
+        transcriber._new_whisper_model("tiny")
+        
+        mock_whisper_model.assert_called_once_with("tiny")
+    
+    @patch('faster_whisper.WhisperModel')
+    def test_create_model_skips_hub_check_after_download(self, mock_whisper_model):
+        """Test that a downloaded model is loaded from local files only."""
+        transcriber = Transcriber(model_name="tiny", compute_type="int8", device="cpu")
+        
+        transcriber._create_model("tiny")
+        self.assertNotIn("local_files_only", mock_whisper_model.call_args[1])
+        self.assertTrue(os.path.exists(transcriber._sentinel_path()))
+        
+        transcriber._create_model("tiny")
+        self.assertTrue(mock_whisper_model.call_args[1]["local_files_only"])
+    
+    @patch('faster_whisper.WhisperModel')
+    def test_create_model_with_repo_id(self, mock_whisper_model):
+        """Test that hub repo ids get a marker in the cache directory itself."""
+        transcriber = Transcriber(
+            model_name="Systran/faster-distil-whisper-small.en", compute_type="int8", device="cpu"
+        )
+        
+        transcriber._create_model(transcriber.model_name)
+        
+        sentinel = transcriber._sentinel_path()
+        self.assertEqual(os.path.dirname(sentinel), self.cache_dir)
+        self.assertTrue(os.path.exists(sentinel))
+    
+    @patch('builtins.open', side_effect=PermissionError("read-only"))
+    @patch('faster_whisper.WhisperModel')
+    def test_create_model_ignores_marker_errors(self, mock_whisper_model, mock_open):
+        """Test that failing to write the marker doesn't fail the load."""
+        transcriber = Transcriber(model_name="tiny", compute_type="int8", device="cpu")
+        
+        model = transcriber._create_model("tiny")
+        
+        self.assertIs(model, mock_whisper_model.return_value)
+    
+    @patch('faster_whisper.WhisperModel')
+    def test_create_model_downloads_when_cache_is_stale(self, mock_whisper_model):
+        """Test the download fallback when cached files are missing."""
+        transcriber = Transcriber(model_name="tiny", compute_type="int8", device="cpu")
+        open(transcriber._sentinel_path(), "w").close()
+        mock_whisper_model.side_effect = [FileNotFoundError("gone"), MagicMock()]
+        
+        transcriber._create_model("tiny")
+        
+        self.assertEqual(mock_whisper_model.call_count, 2)
+        self.assertNotIn("local_files_only", mock_whisper_model.call_args[1])
+    
+    @patch.object(Transcriber, '_submit')
+    @patch('faster_whisper.WhisperModel')
+    def test_load_model_reuses_cached_model(self, mock_whisper_model, mock_submit):
+        """Test that a second Transcriber with the same config skips reloading."""
+        first = Transcriber(model_name="tiny", compute_type="int8", device="cpu")
+        first.load_model()
+        mock_submit.call_args[0][0]()
+        
+        second = Transcriber(model_name="tiny", compute_type="int8", device="cpu")
+        second.load_model()
+        mock_submit.call_args[0][0]()
+        
+        mock_whisper_model.assert_called_once()
+        self.assertIs(first.model, second.model)
+        self.assertTrue(second.is_loaded)
+    
+    @patch.object(Transcriber, '_submit')
+    @patch('faster_whisper.WhisperModel')
+    def test_load_model_evicts_previous_model(self, mock_whisper_model, mock_submit):
+        """Test that loading another model drops the cached one."""
+        first = Transcriber(model_name="tiny", compute_type="int8", device="cpu")
+        first.load_model()
+        mock_submit.call_args[0][0]()
+        
+        second = Transcriber(model_name="base", compute_type="int8", device="cpu")
+        second.load_model()
+        mock_submit.call_args[0][0]()
         
+        self.assertEqual(
+            list(transcriber_module._MODEL_CACHE), [("base", "cpu", 0, "int8")]
+        )
+    
+    @patch.object(Transcriber, '_submit')
+    @patch('faster_whisper.WhisperModel')
+    def test_load_model(self, mock_whisper_model, mock_submit):
+        """Test loading the Whisper model."""
         # Define a test callback
         test_callback = MagicMock()
         
         # Load the model
         self.transcriber.load_model(callback=test_callback)
         
-        # Check that the thread was started
-        mock_thread.assert_called_once()
-        mock_thread.return_value.start.assert_called_once()
+        # Check that the loader was handed to the worker
+        mock_submit.assert_called_once()
     
     def test_load_model_already_loaded(self):
         """Test loading the model when it's already loaded."""
         # Mark the model as loaded
         self.transcriber.is_loaded = True
         
-        # Create a mock for the thread
-        with patch('threading.Thread') as mock_thread:
+        # Create a mock for the worker
+        with patch.object(self.transcriber, '_submit') as mock_submit:
             # Try to load the model
             self.transcriber.load_model()
             
-            # Thread should not be created
-            mock_thread.assert_not_called()
+            # Nothing should be submitted
+            mock_submit.assert_not_called()
+    
+    def test_worker_is_reused(self):
+        """Test that tasks share one worker thread until close."""
+        names = [self.transcriber._submit(lambda: threading.current_thread().name).result()
+                 for _ in range(2)]
+        
+        self.assertEqual(names[0], names[1])
+        self.assertTrue(names[0].startswith("transcriber"))
+        
+        self.transcriber.close()
+        self.assertIsNone(self.transcriber._pool)
     
     def test_transcribe_model_not_loaded(self):
         """Test transcribing audio when the model is not loaded."""
@@ -78,6 +279,29 @@ class TestTranscriber(unittest.TestCase):
         # Should return False
         self.assertFalse(result)
     
+    @patch.object(Transcriber, '_submit')
+    def test_warm_up(self, mock_submit):
+        """Test that warm-up transcribes silence and reports success."""
+        self.transcriber.is_loaded = True
+        self.transcriber.model = MagicMock()
+        self.transcriber.model.transcribe.return_value = (iter([]), None)
+        test_callback = MagicMock()
+        
+        self.assertTrue(self.transcriber.warm_up(callback=test_callback))
+        self.assertTrue(self.transcriber.is_transcribing)
+        
+        # Run the warm-up synchronously
+        mock_submit.call_args[0][0]()
+        
+        audio = self.transcriber.model.transcribe.call_args[0][0]
+        self.assertFalse(audio.any())
+        test_callback.assert_called_once_with(True)
+        self.assertFalse(self.transcriber.is_transcribing)
+    
+    def test_warm_up_model_not_loaded(self):
+        """Test that warm-up is skipped before the model is loaded."""
+        self.assertFalse(self.transcriber.warm_up())
+    
     def test_transcribe_already_transcribing(self):
         """Test transcribing when already transcribing."""
         # Set up state
@@ -104,27 +328,102 @@ class TestTranscriber(unittest.TestCase):
         # Should return False
         self.assertFalse(result)
     
-    @patch('os.path.exists', return_value=True)
-    @patch('threading.Thread')
-    def test_transcribe_success(self, mock_thread, mock_exists):
+    @patch.object(Transcriber, '_submit')
+    def test_transcribe_success(self, mock_submit):
         """Test transcribing audio successfully."""
         # Set up state
         self.transcriber.is_loaded = True
         self.transcriber.model = MagicMock()
-        mock_thread.return_value.daemon = None
         
         # Create test callback
         test_callback = MagicMock()
         
         # Try to transcribe
-        result = self.transcriber.transcribe("test.wav", callback=test_callback)
+        result = self.transcriber.transcribe(self.audio_path, callback=test_callback)
         
         # Check results
         self.assertTrue(result)
         self.assertTrue(self.transcriber.is_transcribing)
         self.assertEqual(self.transcriber._callback, test_callback)
-        mock_thread.assert_called_once()
-        mock_thread.return_value.start.assert_called_once()
+        mock_submit.assert_called_once()
+        
+        # Let the worker finish so it closes the audio file
+        self.transcriber.model.transcribe.return_value = (iter([]), MagicMock())
+        mock_submit.call_args[0][0]()
+    
+    @patch.object(Transcriber, '_submit')
+    def test_transcribe_joins_segments(self, mock_submit):
+        """Test that the worker joins the decoded segments into one text."""
+        # Set up a model returning two segments
+        self.transcriber.is_loaded = True
+        self.transcriber.model = MagicMock()
+        segments = [MagicMock(text=" Hello"), MagicMock(text=" world. ")]
+        self.transcriber.model.transcribe.return_value = (iter(segments), MagicMock())
+        test_callback = MagicMock()
+        
+        # Start the transcription and run the worker synchronously
+        self.transcriber.transcribe(self.audio_path, callback=test_callback)
+        mock_submit.call_args[0][0]()
+        
+        # Check the joined result and the decoding options
+        test_callback.assert_called_once_with("Hello world.")
+        self.assertFalse(self.transcriber.is_transcribing)
+        self.transcriber.model.transcribe.assert_called_once_with(
+            ANY, beam_size=1, vad_filter=True
+        )
+        
+        # The worker decodes from the handle opened by transcribe()
+        audio = self.transcriber.model.transcribe.call_args[0][0]
+        self.assertEqual(audio.name, self.audio_path)
+        self.assertTrue(audio.closed)
+    
+    @patch.object(Transcriber, '_submit')
+    def test_transcribe_clips_to_speech(self, mock_submit):
+        """Test that speech bounds are passed as clip timestamps."""
+        self.transcriber.is_loaded = True
+        self.transcriber.model = MagicMock()
+        self.transcriber.model.transcribe.return_value = (iter([]), MagicMock())
+        
+        self.transcriber.transcribe(self.audio_path, clip_start=0.5, clip_end=2.0)
+        mock_submit.call_args[0][0]()
+        
+        self.transcriber.model.transcribe.assert_called_once_with(
+            ANY, beam_size=1, clip_timestamps=[0.5, 2.0]
+        )
+    
+    @patch.object(Transcriber, '_submit')
+    def test_transcribe_streams_segments(self, mock_submit):
+        """Test that each decoded segment is reported before the result."""
+        self.transcriber.is_loaded = True
+        self.transcriber.model = MagicMock()
+        segments = [MagicMock(text=" Hello", end=1.0), MagicMock(text=" world.", end=2.5)]
+        self.transcriber.model.transcribe.return_value = (iter(segments), MagicMock())
+        events = MagicMock()
+        
+        self.transcriber.transcribe(
+            self.audio_path, callback=events.done, segment_callback=events.segment
+        )
+        mock_submit.call_args[0][0]()
+        
+        self.assertEqual(
+            [call[0] for call in events.mock_calls if "__" not in call[0]],
+            ["segment", "segment", "done"]
+        )
+        events.segment.assert_any_call(" world.", 2.5)
+        events.done.assert_called_once_with("Hello world.")
+    
+    @patch.object(Transcriber, '_submit')
+    def test_transcribe_samples(self, mock_submit):
+        """Test that a NumPy array is passed to the model without a file check."""
+        self.transcriber.is_loaded = True
+        self.transcriber.model = MagicMock()
+        self.transcriber.model.transcribe.return_value = (iter([]), MagicMock())
+        samples = np.zeros(16000, dtype=np.float32)
+        
+        self.assertTrue(self.transcriber.transcribe(samples))
+        mock_submit.call_args[0][0]()
+        
+        self.assertIs(self.transcriber.model.transcribe.call_args[0][0], samples)
     
     def test_get_last_result(self):
         """Test getting the last transcription result."""
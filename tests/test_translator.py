@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Unit tests for the Translator class.
+"""
+
+import unittest
+from unittest.mock import patch, MagicMock
+
+from translator import Translator
+
+
+class TestTranslator(unittest.TestCase):
+    """Test cases for the Translator class."""
+    
+    def setUp(self):
+        """Set up the test environment before each test."""
+        self.translator = Translator("/models/nllb", compute_type="int8")
+    
+    def test_initialization(self):
+        """Test that the model is not loaded until first use."""
+        self.assertEqual(self.translator.model_path, "/models/nllb")
+        self.assertEqual(self.translator.device, "cpu")
+        self.assertIsNone(self.translator._translator)
+    
+    def test_translate_empty_batch(self):
+        """Test that an empty batch does not load the model."""
+        self.assertEqual(self.translator.translate_batch([], []), [])
+        self.assertIsNone(self.translator._translator)
+    
+    @patch('translator.sentencepiece.SentencePieceProcessor')
+    @patch('translator.ctranslate2.Translator')
+    def test_translate_batch(self, mock_ct2_translator, mock_sp):
+        """Test that texts are tokenized with NLLB language tokens."""
+        tokenizer = mock_sp.return_value
+        tokenizer.encode.side_effect = lambda text, out_type: text.split()
+        tokenizer.decode.side_effect = lambda tokens: " ".join(tokens)
+        mock_ct2_translator.return_value.translate_batch.return_value = [
+            MagicMock(hypotheses=[["eng_Latn", "Hello", "world"]]),
+            MagicMock(hypotheses=[["jpn_Jpan", "こんにちは"]]),
+        ]
+        
+        result = self.translator.translate_batch(["Xin chào", "Chào"], ["en", "ja"])
+        
+        self.assertEqual(result, ["Hello world", "こんにちは"])
+        mock_ct2_translator.assert_called_once_with(
+            "/models/nllb", device="cpu", compute_type="int8"
+        )
+        mock_ct2_translator.return_value.translate_batch.assert_called_once_with(
+            [["vie_Latn", "Xin", "chào", "</s>"], ["vie_Latn", "Chào", "</s>"]],
+            target_prefix=[["eng_Latn"], ["jpn_Jpan"]],
+            beam_size=1
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()